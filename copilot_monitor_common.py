@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+定时器监控和安全监控共用的辅助工具
+可选依赖导入、剪贴板复制/恢复、VS Code窗口缓存、非阻塞读取交互输入
+"""
+
+import ctypes
+import importlib
+import os
+import selectors
+import sys
+import threading
+import time
+
+VSCODE_TITLE = 'Visual Studio Code'
+
+
+def optional_import(name):
+    """导入可选模块，失败时返回None (pyautogui等在无桌面环境下可能抛出非ImportError异常)"""
+    try:
+        return importlib.import_module(name)
+    except Exception:
+        return None
+
+
+class ClipboardHelper:
+    """剪贴板复制与延迟恢复
+    
+    整个会话只有一个恢复定时器，新的复制会重置计时而不是再开一个线程。
+    pyperclip 为None时只能逐字输入，copy 不可用。
+    """
+    
+    def __init__(self, pyperclip, logger):
+        self.pyperclip = pyperclip
+        self.logger = logger
+        self._restore_timer = None
+        self._backup = ""
+    
+    def copy(self, text: str, restore_after: float):
+        """把文本放进剪贴板，restore_after 秒后恢复原内容"""
+        # 备份剪贴板；上一次的恢复还没执行时剪贴板里是我们的命令，沿用之前的备份
+        if self._restore_timer is not None and self._restore_timer.is_alive():
+            self._restore_timer.cancel()
+        else:
+            self._backup = ""
+            try:
+                self._backup = self.pyperclip.paste()
+            except Exception as e:
+                self.logger.debug("读取剪贴板失败: %s", e)
+        
+        self.pyperclip.copy(text)
+        
+        self._restore_timer = threading.Timer(restore_after, self.restore)
+        self._restore_timer.daemon = True
+        self._restore_timer.start()
+    
+    def paste(self, pyautogui, text: str, restore_after: float, interval: float = 0.03):
+        """输入文本：优先通过剪贴板 Ctrl+V 一次粘贴，没有pyperclip时逐字输入"""
+        if self.pyperclip is None:
+            pyautogui.write(text, interval=interval)
+            return
+        self.copy(text, restore_after)
+        pyautogui.hotkey('ctrl', 'v')
+    
+    def restore(self):
+        """恢复备份的剪贴板内容"""
+        try:
+            if self._backup:
+                self.pyperclip.copy(self._backup)
+                self.logger.debug("剪贴板已恢复")
+        except Exception as e:
+            self.logger.debug("恢复剪贴板失败: %s", e)
+    
+    def restore_now(self):
+        """有待执行的恢复时立即恢复，不等定时器（退出前调用）"""
+        if self._restore_timer is not None and self._restore_timer.is_alive():
+            self._restore_timer.cancel()
+            self.restore()
+
+
+class VSCodeWindowCache:
+    """缓存找到的VS Code窗口，句柄有效时不再重新枚举所有窗口"""
+    
+    def __init__(self, gw):
+        self._gw = gw
+        self._window = None
+    
+    def get(self):
+        """获取VS Code窗口：缓存的句柄仍有效时直接复用，否则重新查找"""
+        window = self._window
+        if window is not None:
+            try:
+                if ctypes.windll.user32.IsWindow(window._hWnd):
+                    return window
+            except Exception:
+                pass
+        
+        windows = self._gw.getWindowsWithTitle(VSCODE_TITLE)
+        self._window = windows[0] if windows else None
+        return self._window
+    
+    def invalidate(self):
+        """句柄可能已失效，下次重新查找窗口"""
+        self._window = None
+
+
+class StdinLineReader:
+    """按行读取交互输入，每次最多等待 poll_seconds 秒，没有完整的一行时返回None
+    
+    交互循环因此可以定期检查停止事件，而不是一直阻塞在 input() 上。
+    POSIX下 select 的是stdin的文件描述符，读取也直接用 os.read 并自行拆行，
+    不经过 sys.stdin 的缓冲区：否则一次到达多行时，多出的行留在Python缓冲区里，
+    select 认为没有数据可读，这些命令就再也读不到了。
+    """
+    
+    def __init__(self, poll_seconds: float):
+        self._poll_seconds = poll_seconds
+        self._encoding = getattr(sys.stdin, 'encoding', None) or 'utf-8'
+        self._pending = b""       # 已读入但还不成行的字节
+        self._eof = False
+        self._input_chars = []    # Windows下逐个按键读取时尚未回车的输入
+        self._fd = None
+        self._selector = None
+        if sys.platform != 'win32':
+            try:
+                self._fd = sys.stdin.fileno()
+                self._selector = selectors.DefaultSelector()
+                self._selector.register(self._fd, selectors.EVENT_READ)
+            except (AttributeError, ValueError, OSError):
+                # stdin不是真实文件（如被替换为StringIO）或不支持select，退回阻塞读取
+                self._selector = None
+    
+    def read_line(self):
+        """读取一行输入，超时返回None，输入结束时抛出EOFError"""
+        if self._selector is not None:
+            return self._read_fd_line()
+        
+        if sys.platform == 'win32' and sys.stdin.isatty():
+            return self._read_console_line()
+        
+        # 其他情况退回阻塞读取
+        return input()
+    
+    def _pop_line(self):
+        """从已读入的字节中取出完整的一行，没有时返回None"""
+        end = self._pending.find(b"\n")
+        if end < 0:
+            return None
+        line, self._pending = self._pending[:end + 1], self._pending[end + 1:]
+        return line.decode(self._encoding, 'replace')
+    
+    def _read_fd_line(self):
+        """POSIX：select 文件描述符后用 os.read 读取"""
+        line = self._pop_line()
+        if line is not None:
+            return line
+        if self._eof:
+            raise EOFError
+        
+        if not self._selector.select(self._poll_seconds):
+            return None
+        data = os.read(self._fd, 4096)
+        if not data:
+            self._eof = True
+            # 最后一行没有换行符时也交给调用方
+            if self._pending:
+                line, self._pending = self._pending, b""
+                return line.decode(self._encoding, 'replace')
+            raise EOFError
+        
+        self._pending += data
+        return self._pop_line()
+    
+    def _read_console_line(self):
+        """Windows控制台不能对stdin使用select，用msvcrt逐个读取按键拼成一行"""
+        import msvcrt
+        deadline = time.monotonic() + self._poll_seconds
+        while time.monotonic() < deadline:
+            while msvcrt.kbhit():
+                ch = msvcrt.getwche()
+                if ch in ('\r', '\n'):
+                    sys.stdout.write('\n')
+                    line = ''.join(self._input_chars)
+                    self._input_chars.clear()
+                    return line
+                if ch == '\x03':
+                    raise KeyboardInterrupt
+                if ch == '\b':
+                    if self._input_chars:
+                        self._input_chars.pop()
+                        sys.stdout.write(' \b')
+                else:
+                    self._input_chars.append(ch)
+            time.sleep(0.02)
+        return None
+    
+    def close(self):
+        """注销stdin的selector"""
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
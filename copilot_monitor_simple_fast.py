@@ -11,24 +11,60 @@ import cv2
 import numpy as np
 import pyautogui
 import pygetwindow as gw
-from PIL import Image
+import mss
 import threading
 import sys
 import os
 from typing import Optional, Tuple
-import hashlib
+import json
+
+try:
+    import xxhash  # 可选：缩略图完全相同时跳过DCT
+except ImportError:
+    xxhash = None
+
+try:
+    import pyperclip  # 可选：通过剪贴板一次粘贴消息，未安装时退回逐字输入
+except ImportError:
+    pyperclip = None
+
+# 上次运行的检测状态，重启后用于跳过首轮完整检测
+# 哈希和区域存为JSON，光标区域数组用 np.save 单独存储，均不使用pickle
+STATE_FILE = '.fast_copilot_state.json'
+CURSOR_STATE_FILE = '.fast_copilot_cursor.npy'
+STATE_MAX_AGE = 300  # 超过5分钟的状态不再使用
+
+STOP_JOIN_TIMEOUT = 5.0  # 停止时等待监控线程退出的最长秒数
+
+# 64位整数的置位计数：Python 3.10+ 的 int.bit_count 直接用 popcount 指令
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+else:
+    def _popcount(value: int) -> int:
+        return bin(value).count('1')
+
+# 检测统计计数器下标
+TOTAL_CHECKS, STATIC, CURSOR, LOADING, SENT, NEW_WIN = range(6)
+STAT_LABELS = ('总检测次数', '静态检测', '光标活动', '加载动画', '发送命令', '新窗口')
 
 class FastCopilotMonitor:
     """快速GitHub Copilot Chat状态监控器"""
     
-    def __init__(self):
+    def __init__(self, debug: bool = False):
         """初始化监控器"""
-        self.setup_logging()
+        self.setup_logging(debug)
         self.running = False
-        self.last_action_time = 0.0
+        self._stopped = True  # stop() 已执行过（或尚未启动），避免重复保存和输出统计
+        self._stop_event = threading.Event()
+        self.monitor_thread = None
+        self.last_action_time = 0.0  # 墙上时间，仅用于日志显示
+        self.last_action_monotonic = None  # 单调时钟，用于冷却计算
         
         # 简化设置 - 只要停止超过30秒就判断为停止
         self.check_interval = 5   # 5秒检查一次
+        self.fast_check_interval = 2   # 状态刚发生变化时缩短为2秒
+        self.idle_check_interval = 15  # 长时间画面不变时放宽到15秒
+        self.idle_backoff_ticks = 10   # 连续10次画面相同后开始放宽
         self.static_threshold = 3  # 连续3次相同即开始计时 (减少误判)
         self.cooldown_time = 30   # 30秒冷却时间
         self.min_static_duration = 10  # 最小静止时间：30秒
@@ -41,21 +77,57 @@ class FastCopilotMonitor:
         # 图像匹配设置
         self.last_screenshot_hash = None
         self.static_counter = 0
-        self.static_start_time = None  # 记录开始静止的时间
+        self.static_start_time = None  # 记录开始静止的时间 (time.monotonic)
+        self.hash_distance_threshold = 4  # 感知哈希汉明距离不超过4视为相同画面
+        self._last_thumb_digest = None  # 上一帧缩略图的xxh3摘要
+        self._last_phash = None
+        self._frame_loading = None  # 当前画面的加载动画检测结果，None 表示本画面尚未检测
+        self.last_status = None
+        
+        # 监控状态 (只有 COOLDOWN 会改变循环流程，其余仅用于日志标记)：
+        #   SEARCHING     - 尚未找到VS Code窗口或截图失败
+        #   ACTIVE        - 画面在变化
+        #   STATIC_TIMING - 画面未变化，正在累计停止时间
+        #   COOLDOWN      - 刚发送过命令，冷却结束前不做任何检测
+        self._state = 'SEARCHING'
         
         # 像素检测设置
         self.cursor_blink_area = None
-        self.last_cursor_state = None
+        self.last_cursor_state = None  # 指向上一帧的光标区域
+        self._cursor_idx = 0  # 两个光标区域缓冲区 cursor0/cursor1 轮流使用
+        
+        # 检测流程用到的数组缓冲区 (名称 -> ndarray)，尺寸不变时每轮复用
+        self._arena = {}
+        
+        # 发送前的剪贴板内容，发送流程结束后恢复
+        self._saved_clipboard = None
+        
+        # mss截图实例，在监控线程中首次截图时创建并一直复用
+        self._sct = None
+        self._frame_raw = None       # 本帧mss原始字节 (每次grab都是新的bytearray)
+        self._prev_raw_bytes = None  # 上一帧原始字节，用于逐字节比较
+        
+        # 截图区域缓存 - 窗口未移动/缩放时复用
+        self._last_window_box = None
+        self._capture_region = None
+        self._slice_height = None
+        self._slice_top = None
+        self._slice_content = None
+        self._slice_input = None
+        
+        # 完成模式检测用的形态学核，只创建一次
+        self._h_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (25, 1))
+        self._v_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 15))
+        
+        # 输入框位置缓存：(窗口宽, 窗口高) -> 相对窗口右下角的偏移
+        self._input_pos_cache = {}
+        self.input_detect_scale = 4  # 输入框检测前的缩小倍数
+        
+        # 恢复上次运行保存的图像哈希（需在首次截图时校验区域是否一致）
+        self._saved_state = self._load_saved_state()
         
         # 检测统计
-        self.detection_stats = {
-            'total_checks': 0,
-            'static_detections': 0,
-            'cursor_activities': 0,
-            'loading_animations': 0,
-            'commands_sent': 0,
-            'new_windows_opened': 0
-        }
+        self._stats = np.zeros(len(STAT_LABELS), dtype=np.int64)
         
         self.logger.info("🚀 快速监控工具初始化完成")
         self.logger.info(f"⚡ 检测间隔: {self.check_interval}秒")
@@ -64,11 +136,11 @@ class FastCopilotMonitor:
         self.logger.info(f"⚡ 预计最快检测时间: {self.check_interval * self.static_threshold}秒")
         self.logger.info(f"📝 新窗口消息: '{self.new_window_message}'")
         
-    def setup_logging(self):
+    def setup_logging(self, debug: bool = False):
         """设置日志"""
-        # 设置更详细的日志级别
+        # 默认INFO级别，--debug 或环境变量 FAST_COPILOT_DEBUG=1 时输出详细检测日志
         logging.basicConfig(
-            level=logging.DEBUG,  # 改为DEBUG级别
+            level=logging.DEBUG if debug else logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.FileHandler('fast_copilot_monitor.log', encoding='utf-8'),
@@ -76,16 +148,19 @@ class FastCopilotMonitor:
             ]
         )
         self.logger = logging.getLogger(__name__)
+        # 缓存DEBUG开关，热路径上避免无用的字符串格式化
+        self._dbg = self.logger.isEnabledFor(logging.DEBUG)
     
     def find_vscode_window(self) -> Optional[gw.Win32Window]:
         """查找VS Code窗口"""
         try:
             windows = gw.getWindowsWithTitle(self.vscode_title)
-            self.logger.debug(f"🔍 找到 {len(windows)} 个VS Code窗口")
+            self.logger.debug("🔍 找到 %d 个VS Code窗口", len(windows))
             
             if windows:
                 window = windows[0]
-                self.logger.debug(f"📱 窗口信息: {window.title}, 位置: ({window.left}, {window.top}), 大小: {window.width}x{window.height}")
+                if self._dbg:
+                    self.logger.debug("📱 窗口信息: %s, 位置/大小: %s", window.title, self._window_rect(window))
                 
                 if window.isMinimized:
                     self.logger.warning("⚠️ VS Code窗口被最小化")
@@ -100,52 +175,182 @@ class FastCopilotMonitor:
             self.logger.error(f"❌ 查找VS Code窗口时出错: {e}")
             return None
     
-    def capture_chat_area(self, window: gw.Win32Window) -> Optional[np.ndarray]:
-        """截取聊天区域"""
+    def capture_chat_area(self, rect: Tuple[int, int, int, int]) -> Optional[np.ndarray]:
+        """截取聊天区域，返回BGRA四通道图像
+        
+        返回的是复用缓冲区本身，只在下一次调用 capture_chat_area 之前有效；
+        需要跨帧保留的数据必须自行拷贝。需要BGR时使用 image[:, :, :3] 视图。
+        """
         try:
-            # 聚焦窗口
-            self.logger.debug("🎯 激活VS Code窗口")
-            window.activate()
-            time.sleep(0.2)
-            
-            # 截取右侧区域（Copilot Chat通常在右侧）
-            chat_left = window.left + int(window.width * 0.6)
-            chat_top = window.top + 60  # 跳过标题栏
-            chat_width = int(window.width * 0.4)
-            chat_height = window.height - 200  # 减去标题栏和状态栏
-            
-            self.logger.debug(f"📷 截图区域: ({chat_left}, {chat_top}) 大小: {chat_width}x{chat_height}")
-            
-            screenshot = pyautogui.screenshot(region=(chat_left, chat_top, chat_width, chat_height))
-            image = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-            
-            self.logger.debug(f"✅ 截图成功，图像大小: {image.shape}")
+            # 按屏幕坐标截图，不需要激活窗口，也不会抢走用户当前窗口的焦点
+            chat_left, chat_top, chat_width, chat_height = self._get_capture_region(rect)
+            
+            self.logger.debug("📷 截图区域: (%d, %d) 大小: %dx%d", chat_left, chat_top, chat_width, chat_height)
+            
+            if self._sct is None:
+                self._sct = mss.mss()
+            raw = self._sct.grab({'left': chat_left, 'top': chat_top,
+                                  'width': chat_width, 'height': chat_height})
+            # 缓冲区只在首次截图或窗口尺寸变化时分配
+            shape = (raw.height, raw.width, 4)
+            image = self._buf('frame', shape, np.uint8)
+            # raw.raw 是mss内部的bytearray，直接包装可省去 raw.bgra 的bytes拷贝
+            # 直接返回mss的BGRA数据，灰度转换时一步完成 BGRA->GRAY
+            np.copyto(image, np.frombuffer(raw.raw, dtype=np.uint8).reshape(shape))
+            self._frame_raw = raw.raw
+            
+            self.logger.debug("✅ 截图成功，图像大小: %s", image.shape)
             return image
         except Exception as e:
             self.logger.error(f"❌ 截取聊天区域失败: {e}")
             return None
     
-    def calculate_image_hash(self, image: np.ndarray) -> str:
-        """计算图像哈希用于比较"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        resized = cv2.resize(gray, (64, 64))
-        hash_value = hashlib.md5(resized.tobytes()).hexdigest()
-        self.logger.debug(f"🔢 图像哈希: {hash_value[:8]}...")
+    def _buf(self, name: str, shape: tuple, dtype) -> np.ndarray:
+        """取出名为 name 的复用缓冲区，尺寸或类型变化时重新分配
+        
+        缓冲区内容在下一次同名调用时会被覆盖，需要跨帧保留的数据不要放在这里。
+        """
+        buf = self._arena.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._arena[name] = buf
+        return buf
+    
+    def _window_rect(self, window: gw.Win32Window) -> Tuple[int, int, int, int]:
+        """一次性读取窗口的 (left, top, width, height)
+        
+        pygetwindow 每访问一次 left/top/width/height 都会调用一次 GetWindowRect，
+        调用方应每轮只读取一次并把结果传下去。
+        """
+        return tuple(window.box)
+    
+    def _get_capture_region(self, rect: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+        """计算聊天区域截图范围，窗口位置和大小不变时直接返回缓存"""
+        box = tuple(rect)
+        if box != self._last_window_box:
+            left, top, width, height = box
+            # 截取右侧区域（Copilot Chat通常在右侧）
+            self._capture_region = (
+                left + int(width * 0.6),  # 从60%宽度开始
+                top + 60,                 # 跳过标题栏
+                int(width * 0.4),
+                height - 200              # 减去标题栏和状态栏
+            )
+            self._last_window_box = box
+            self.logger.debug("📐 窗口位置/大小变化，更新截图区域: %s", self._capture_region)
+            
+            if self._saved_state is not None:
+                self._apply_saved_state(self._capture_region)
+        return self._capture_region
+    
+    def _get_region_slices(self, height: int) -> Tuple[slice, slice, slice]:
+        """返回 (顶部, 内容, 输入框) 三个区域的行切片，按图像高度缓存"""
+        if height != self._slice_height:
+            self._slice_top = slice(0, int(height * 0.2))
+            self._slice_content = slice(int(height * 0.2), int(height * 0.8))
+            self._slice_input = slice(int(height * 0.8), height)
+            self._slice_height = height
+        return self._slice_top, self._slice_content, self._slice_input
+    
+    def _load_saved_state(self) -> Optional[dict]:
+        """读取上次运行保存的检测状态，过期或损坏时忽略"""
+        try:
+            if not os.path.exists(STATE_FILE):
+                return None
+            with open(STATE_FILE, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            age = time.time() - state.get('saved_at', 0)
+            if not 0 <= age < STATE_MAX_AGE:
+                self.logger.debug("💾 上次状态已过期 (%.0f秒前)，忽略", age)
+                return None
+            if os.path.exists(CURSOR_STATE_FILE):
+                state['last_cursor_state'] = np.load(CURSOR_STATE_FILE, allow_pickle=False)
+            return state
+        except Exception as e:
+            self.logger.debug("💾 读取上次状态失败: %s", e)
+            return None
+    
+    def _apply_saved_state(self, region: Tuple[int, int, int, int]):
+        """截图区域与上次一致时，用保存的哈希和光标状态作为初始值"""
+        state, self._saved_state = self._saved_state, None
+        if tuple(state.get('capture_region', ())) != region:
+            self.logger.debug("💾 截图区域已变化，不使用上次状态")
+            return
+        saved_hash = state.get('last_screenshot_hash')
+        if not isinstance(saved_hash, int):
+            return
+        self.last_screenshot_hash = saved_hash
+        self.last_cursor_state = state.get('last_cursor_state')
+        self.logger.info("💾 已恢复上次运行的画面状态")
+    
+    def _save_state(self):
+        """保存当前检测状态，供下次启动时使用"""
+        if self.last_screenshot_hash is None or self._capture_region is None:
+            return
+        state = {
+            'saved_at': time.time(),
+            'capture_region': list(self._capture_region),
+            'last_screenshot_hash': self.last_screenshot_hash,
+        }
+        try:
+            with open(STATE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            if self.last_cursor_state is not None:
+                np.save(CURSOR_STATE_FILE, self.last_cursor_state, allow_pickle=False)
+            elif os.path.exists(CURSOR_STATE_FILE):
+                os.remove(CURSOR_STATE_FILE)
+        except Exception as e:
+            self.logger.warning(f"⚠️ 保存检测状态失败: {e}")
+    
+    def calculate_image_hash(self, thumb: np.ndarray) -> int:
+        """由32x32灰度缩略图计算64位感知哈希 (pHash)，容忍光标闪烁、抗锯齿等细小变化"""
+        # 缩略图与上一帧逐字节相同时直接复用上次的pHash
+        if xxhash is not None:
+            digest = xxhash.xxh3_64_intdigest(thumb.data)
+            if digest == self._last_thumb_digest:
+                self.logger.debug("🔢 缩略图未变化，复用图像哈希")
+                return self._last_phash
+            self._last_thumb_digest = digest
+        
+        # 取DCT左上角8x8低频分量，与中位数比较得到64个比特 (中位数不含直流分量)
+        thumb_f32 = self._buf('thumb_f32', thumb.shape, np.float32)
+        np.copyto(thumb_f32, thumb)
+        block = cv2.dct(thumb_f32, dst=self._buf('dct', thumb.shape, np.float32))[:8, :8].flatten()
+        bits = block > np.median(block[1:])
+        hash_value = int.from_bytes(np.packbits(bits).tobytes(), 'big')
+        self._last_phash = hash_value
+        self.logger.debug("🔢 图像哈希: %016x", hash_value)
         return hash_value
     
-    def detect_static_content(self, image: np.ndarray) -> bool:
-        """检测内容是否停止超过2分钟"""
-        current_hash = self.calculate_image_hash(image)
-        current_time = time.time()
+    @staticmethod
+    def hash_distance(h1: int, h2: int) -> int:
+        """两个感知哈希之间的汉明距离"""
+        return _popcount(h1 ^ h2)
+    
+    def detect_static_content(self, gray: Optional[np.ndarray]) -> bool:
+        """检测内容是否停止超过2分钟
+        
+        gray 为 None 表示本帧与上一帧逐字节相同，直接按未变化处理，不计算哈希。
+        """
+        current_time = time.monotonic()
+        if gray is None:
+            current_hash = self.last_screenshot_hash
+            is_same = True
+        else:
+            thumb = cv2.resize(gray, (32, 32), dst=self._buf('thumb', (32, 32), np.uint8),
+                               interpolation=cv2.INTER_AREA)
+            current_hash = self.calculate_image_hash(thumb)
+            is_same = (self.last_screenshot_hash is not None and
+                       self.hash_distance(self.last_screenshot_hash, current_hash) <= self.hash_distance_threshold)
         
-        if self.last_screenshot_hash == current_hash:
+        if is_same:
             # 如果是第一次检测到停止，记录开始时间
             if self.static_start_time is None:
                 self.static_start_time = current_time
                 self.logger.info("⏸️ 开始检测停止状态...")
             
             self.static_counter += 1
-            self.detection_stats['static_detections'] += 1
+            self._stats[STATIC] += 1
             
             # 计算已经停止的时间
             static_duration = current_time - self.static_start_time
@@ -178,50 +383,68 @@ class FastCopilotMonitor:
         
         return is_truly_stopped
     
-    def detect_cursor_activity(self, image: np.ndarray) -> bool:
+    def detect_cursor_activity(self, gray: np.ndarray) -> bool:
         """检测光标活动"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            height, width = gray.shape
-            input_area = gray[int(height * 0.8):, :]
+            _, _, input_rows = self._get_region_slices(gray.shape[0])
+            input_area = gray[input_rows, :]
             
-            self.logger.debug(f"👆 检查光标区域大小: {input_area.shape}")
+            self.logger.debug("👆 检查光标区域大小: %s", input_area.shape)
             
-            if self.last_cursor_state is not None:
-                diff = cv2.absdiff(input_area, self.last_cursor_state)
-                activity_level = np.sum(diff > 30)
-                self.last_cursor_state = input_area.copy()
-                
-                is_cursor_active = bool(5 < activity_level < 100)
-                
-                self.logger.debug(f"👆 光标活动级别: {activity_level}, 活跃: {is_cursor_active}")
-                
-                if is_cursor_active:
-                    self.detection_stats['cursor_activities'] += 1
-                    self.logger.info("✨ 检测到光标活动 - 可能正在等待输入")
-                    
-                return is_cursor_active
-            else:
-                self.last_cursor_state = input_area.copy()
+            prev = self.last_cursor_state
+            if prev is not None and prev.shape != input_area.shape:
+                prev = None  # 窗口尺寸变化，旧状态不可比较
+            
+            # 写入当前缓冲区，上一帧保留在另一个缓冲区中
+            cur = self._buf(f'cursor{self._cursor_idx}', input_area.shape, np.uint8)
+            np.copyto(cur, input_area)
+            self.last_cursor_state = cur
+            self._cursor_idx ^= 1
+            
+            if prev is None:
                 self.logger.debug("👆 初始化光标状态检测")
                 return False
+            
+            activity_level = self._count_changed_pixels(cur, prev, 30)
+            
+            is_cursor_active = bool(5 < activity_level < 100)
+            
+            self.logger.debug("👆 光标活动级别: %d, 活跃: %s", activity_level, is_cursor_active)
+            
+            if is_cursor_active:
+                self._stats[CURSOR] += 1
+                self.logger.info("✨ 检测到光标活动 - 可能正在等待输入")
+                
+            return is_cursor_active
         except Exception as e:
             self.logger.error(f"❌ 检测光标活动时出错: {e}")
             return False
     
-    def detect_loading_animation(self, image: np.ndarray) -> bool:
+    def _count_changed_pixels(self, a: np.ndarray, b: np.ndarray, threshold: int) -> int:
+        """统计两幅灰度图中差值超过 threshold 的像素数
+        
+        absdiff、二值化都写入同一个复用的缓冲区，计数用 countNonZero，
+        全程不产生布尔掩码或其他临时数组。
+        """
+        diff = cv2.absdiff(a, b, dst=self._buf('cursor_diff', a.shape, np.uint8))
+        cv2.threshold(diff, threshold, 255, cv2.THRESH_BINARY, dst=diff)
+        return cv2.countNonZero(diff)
+    
+    def detect_loading_animation(self, gray: np.ndarray) -> bool:
         """检测加载动画"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            # 加载动画出现在最后一条消息附近，只在中部区域内找圆
+            height, width = gray.shape
+            roi = gray[int(height * 0.3):int(height * 0.8), int(width * 0.2):int(width * 0.8)]
             circles = cv2.HoughCircles(
-                gray, cv2.HOUGH_GRADIENT, 1, 50,
+                roi, cv2.HOUGH_GRADIENT, 1, 50,
                 param1=50, param2=30, minRadius=5, maxRadius=30
             )
             
             has_loading = circles is not None and len(circles[0]) > 0
             
             if has_loading:
-                self.detection_stats['loading_animations'] += 1
+                self._stats[LOADING] += 1
                 circle_count = len(circles[0])
                 self.logger.info(f"🔄 检测到加载动画! 找到 {circle_count} 个圆形元素")
             else:
@@ -232,31 +455,43 @@ class FastCopilotMonitor:
             self.logger.error(f"❌ 检测加载动画时出错: {e}")
             return False
     
-    def detect_stop_indicators(self, image: np.ndarray) -> bool:
+    @staticmethod
+    def _otsu_threshold(hist: np.ndarray) -> int:
+        """由256级灰度直方图计算Otsu阈值，与 cv2.THRESH_OTSU 结果一致"""
+        hist = hist.astype(np.float64)
+        omega = np.cumsum(hist)                       # 前景像素数
+        mu = np.cumsum(hist * np.arange(256))         # 前景灰度和
+        total, mu_total = omega[-1], mu[-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            between = (mu_total * omega - mu * total) ** 2 / (omega * (total - omega))
+        return int(np.argmax(np.nan_to_num(between, nan=0.0, posinf=0.0)))
+    
+    def detect_stop_indicators(self, gray: np.ndarray) -> bool:
         """检测明确的停止指示器"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
             # 检测方法1: 查找停止按钮或完成指示器
             # 通常Copilot停止时会显示停止按钮或完成状态
             
-            # 检测深色区域 (可能是停止按钮)
-            dark_pixels = np.sum(gray < 50)
+            # 一次直方图统计同时得到深色像素数和Otsu阈值
+            hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
             total_pixels = gray.shape[0] * gray.shape[1]
-            dark_ratio = dark_pixels / total_pixels
+            
+            # 检测深色区域 (可能是停止按钮)
+            dark_ratio = float(hist[:50].sum()) / total_pixels
             
             # 检测边缘 (停止状态通常有清晰的边界)
-            edges = cv2.Canny(gray, 50, 150)
-            edge_density = np.sum(edges > 0) / total_pixels
+            edges = cv2.Canny(gray, 50, 150, edges=self._buf('edges', gray.shape, np.uint8))
+            edge_density = cv2.countNonZero(edges) / total_pixels
             
-            # 检测文本区域的密度 (停止时文本通常更少)
-            binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
-            text_density = np.sum(binary == 0) / total_pixels
+            # 检测文本区域的密度 (停止时文本通常更少)：Otsu二值化后不超过阈值的像素
+            otsu_threshold = self._otsu_threshold(hist)
+            text_density = float(hist[:otsu_threshold + 1].sum()) / total_pixels
             
-            self.logger.debug(f"🛑 停止指示器检测:")
-            self.logger.debug(f"   深色比例: {dark_ratio:.3f}")
-            self.logger.debug(f"   边缘密度: {edge_density:.3f}")
-            self.logger.debug(f"   文本密度: {text_density:.3f}")
+            if self._dbg:
+                self.logger.debug("🛑 停止指示器检测:")
+                self.logger.debug("   深色比例: %.3f", dark_ratio)
+                self.logger.debug("   边缘密度: %.3f", edge_density)
+                self.logger.debug("   文本密度: %.3f", text_density)
             
             # 判断条件：深色区域较少，边缘清晰，文本密度适中
             is_stopped = (
@@ -274,26 +509,27 @@ class FastCopilotMonitor:
             self.logger.error(f"❌ 检测停止指示器时出错: {e}")
             return False
     
-    def detect_completion_patterns(self, image: np.ndarray) -> bool:
+    def detect_completion_patterns(self, gray: np.ndarray) -> bool:
         """检测完成模式 - 通过模板匹配"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
             # 检测水平线条 (完成后常见的分隔线)
-            horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (25, 1))
-            horizontal_lines = cv2.morphologyEx(gray, cv2.MORPH_OPEN, horizontal_kernel)
+            horizontal_lines = cv2.morphologyEx(gray, cv2.MORPH_OPEN, self._h_kernel,
+                                                dst=self._buf('h_lines', gray.shape, np.uint8))
             
             # 检测垂直结构 (停止状态的侧边栏)
-            vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 15))
-            vertical_lines = cv2.morphologyEx(gray, cv2.MORPH_OPEN, vertical_kernel)
+            vertical_lines = cv2.morphologyEx(gray, cv2.MORPH_OPEN, self._v_kernel,
+                                              dst=self._buf('v_lines', gray.shape, np.uint8))
             
-            # 统计线条数量
-            horizontal_count = np.sum(horizontal_lines > 100)
-            vertical_count = np.sum(vertical_lines > 100)
+            # 统计线条数量 (原地二值化后计数，不生成布尔掩码)
+            cv2.threshold(horizontal_lines, 100, 255, cv2.THRESH_BINARY, dst=horizontal_lines)
+            cv2.threshold(vertical_lines, 100, 255, cv2.THRESH_BINARY, dst=vertical_lines)
+            horizontal_count = cv2.countNonZero(horizontal_lines)
+            vertical_count = cv2.countNonZero(vertical_lines)
             
-            self.logger.debug(f"📐 完成模式检测:")
-            self.logger.debug(f"   水平线条: {horizontal_count}")
-            self.logger.debug(f"   垂直线条: {vertical_count}")
+            if self._dbg:
+                self.logger.debug("📐 完成模式检测:")
+                self.logger.debug("   水平线条: %d", horizontal_count)
+                self.logger.debug("   垂直线条: %d", vertical_count)
             
             # 判断是否有完成的结构特征
             has_completion_pattern = bool(horizontal_count > 100 or vertical_count > 50)
@@ -307,23 +543,26 @@ class FastCopilotMonitor:
             self.logger.error(f"❌ 检测完成模式时出错: {e}")
             return False
     
-    def detect_interface_elements(self, image: np.ndarray) -> dict:
+    @staticmethod
+    def _region_variance(region: np.ndarray) -> float:
+        """计算uint8区域的方差，由OpenCV单次遍历完成，不生成float64副本"""
+        _, stddev = cv2.meanStdDev(region)
+        return float(stddev[0, 0]) ** 2
+    
+    def _band_variances(self, gray: np.ndarray) -> Tuple[float, float, float]:
+        """依次计算顶部、内容、输入框三个水平区域的方差
+        
+        三个区域都是整行切片，是原图上的连续视图，不产生拷贝；
+        每个区域由一次 meanStdDev 遍历完成，整幅图合计只遍历一遍。
+        """
+        return tuple(self._region_variance(gray[rows, :])
+                     for rows in self._get_region_slices(gray.shape[0]))
+    
+    def detect_interface_elements(self, gray: np.ndarray) -> dict:
         """检测界面元素来判断状态"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            height, width = gray.shape
-            
-            # 检测输入框区域 (通常在底部)
-            input_region = gray[int(height * 0.8):, :]
-            input_variance = float(np.var(input_region.astype(np.float64)))
-            
-            # 检测内容区域 (中部)
-            content_region = gray[int(height * 0.2):int(height * 0.8), :]
-            content_variance = float(np.var(content_region.astype(np.float64)))
-            
-            # 检测顶部区域 (标题栏)
-            top_region = gray[:int(height * 0.2), :]
-            top_variance = float(np.var(top_region.astype(np.float64)))
+            # 顶部区域 (标题栏)、内容区域 (中部)、输入框区域 (通常在底部)
+            top_variance, content_variance, input_variance = self._band_variances(gray)
             
             elements = {
                 'input_variance': input_variance,
@@ -334,13 +573,14 @@ class FastCopilotMonitor:
                 'interface_stable': bool(top_variance < 200)
             }
             
-            self.logger.debug(f"🎛️ 界面元素检测:")
-            self.logger.debug(f"   输入区变化: {input_variance:.1f}")
-            self.logger.debug(f"   内容区变化: {content_variance:.1f}")
-            self.logger.debug(f"   顶部区变化: {top_variance:.1f}")
-            self.logger.debug(f"   输入焦点: {elements['has_input_focus']}")
-            self.logger.debug(f"   有内容: {elements['has_content']}")
-            self.logger.debug(f"   界面稳定: {elements['interface_stable']}")
+            if self._dbg:
+                self.logger.debug("🎛️ 界面元素检测:")
+                self.logger.debug("   输入区变化: %.1f", input_variance)
+                self.logger.debug("   内容区变化: %.1f", content_variance)
+                self.logger.debug("   顶部区变化: %.1f", top_variance)
+                self.logger.debug("   输入焦点: %s", elements['has_input_focus'])
+                self.logger.debug("   有内容: %s", elements['has_content'])
+                self.logger.debug("   界面稳定: %s", elements['interface_stable'])
             
             return elements
             
@@ -349,59 +589,104 @@ class FastCopilotMonitor:
             return {}
 
     def analyze_status_by_pixels(self, image: np.ndarray) -> str:
-        """简化状态分析 - 只要停止超过30秒就判断为停止"""
-        self.detection_stats['total_checks'] += 1
+        """简化状态分析 - 只要停止超过30秒就判断为停止 (image 为 capture_chat_area 返回的BGRA图像)"""
+        self._stats[TOTAL_CHECKS] += 1
         
         self.logger.debug("🔍 开始状态分析...")
         
-        # 主要检测：内容是否停止超过30秒
-        is_truly_stopped = self.detect_static_content(image)
+        # 记录各检测器结果，None 表示已提前得出结论而跳过 (日志中显示为 None)
+        detections = {'truly_stopped': None, 'cursor_activity': None, 'loading_animation': None}
+        
+        # 最便宜的判断：与上一帧原始字节完全相同 (bytearray比较走memcmp)，则无需任何图像处理
+        raw, prev_raw = self._frame_raw, self._prev_raw_bytes
+        self._prev_raw_bytes = raw
+        if (self.last_screenshot_hash is not None and raw is not None
+                and prev_raw is not None and raw == prev_raw):
+            self.logger.debug("⏭️ 画面与上一帧逐字节相同，跳过灰度转换和哈希计算")
+            gray = None
+        else:
+            # 整帧只做一次灰度转换，所有检测器共用；新画面需要重新检测加载动画
+            self._frame_loading = None
+            gray = cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY, dst=self._buf('gray', image.shape[:2], np.uint8))
+        status = self._classify_status(gray, detections)
+        
+        # 输出简化的检测结果
+        if self._dbg:
+            self.logger.debug("📊 检测结果:")
+            self.logger.debug("   停止超过30秒: %s", detections['truly_stopped'])
+            self.logger.debug("   停止计数: %d/%d", self.static_counter, self.static_threshold)
+            self.logger.debug("   光标活动: %s", detections['cursor_activity'])
+            self.logger.debug("   加载动画: %s", detections['loading_animation'])
+            self.logger.debug("   最终状态: %s", status)
         
-        # 辅助检测
-        has_cursor_activity = self.detect_cursor_activity(image)
-        has_loading_animation = self.detect_loading_animation(image)
+        return status
+    
+    def _classify_status(self, gray: Optional[np.ndarray], detections: dict) -> str:
+        """按开销从低到高依次检测，一旦能确定状态立即返回，跳过后续更慢的检测
         
-        # 改进的状态判断逻辑 - 优先考虑停止状态，减少加载动画误判
+        gray 为 None (帧未变化) 时一定进入静态检测分支；该分支的加载动画检测结果按画面缓存，
+        逐字节相同的帧直接复用上一次的结果。
+        """
+        # 1. 主要检测：内容是否停止超过30秒 (仅需感知哈希)
+        is_truly_stopped = self.detect_static_content(gray)
+        detections['truly_stopped'] = is_truly_stopped
         if is_truly_stopped:
             # 停止超过30秒，即使有加载动画也认为已停止
-            status = "stopped"
             self.logger.info("🛑 状态判断: STOPPED (停止超过30秒)")
-        elif self.static_counter > 0:
-            # 正在停止中，但还没到30秒
-            remaining_time = 0
-            if self.static_start_time:
-                elapsed = time.time() - self.static_start_time
-                remaining_time = max(0, self.min_static_duration - elapsed)
-            
-            # 如果有加载动画但已经停止很久，优先考虑停止
-            if elapsed > 25:  # 25秒后即使有动画也开始怀疑
+            return "stopped"
+        
+        if self.static_counter > 0:
+            # 画面与上一帧相同：光标结果不影响判断，跳过光标检测
+            self.logger.debug("⏭️ 画面未变化，跳过光标检测")
+            elapsed = time.monotonic() - self.static_start_time if self.static_start_time else 0.0
+            if elapsed > 25:  # 25秒后即使有动画也开始怀疑已停止
                 status = "stopped" if elapsed >= 30 else "probably_stopped"
-                self.logger.info(f"⚠️ 状态判断: {'STOPPED' if status == 'stopped' else 'PROBABLY_STOPPED'} (停止 {elapsed:.1f}秒，即使检测到动画)")
-            elif has_loading_animation:
-                status = "thinking"
+                self.logger.info(f"⚠️ 状态判断: {'STOPPED' if status == 'stopped' else 'PROBABLY_STOPPED'} (停止 {elapsed:.1f}秒)")
+                return status
+            # 静止画面上仍可能显示加载动画 (与原逻辑一致，判为 thinking)
+            has_loading_animation = self._loading_for_frame(gray)
+            detections['loading_animation'] = has_loading_animation
+            if has_loading_animation:
                 self.logger.info(f"🤔 状态判断: THINKING (停止中 {elapsed:.1f}秒，有加载动画)")
-            else:
-                status = "active"
-                self.logger.info(f"🟡 状态判断: ACTIVE (停止中，还需 {remaining_time:.1f}秒到30秒)")
-        elif has_loading_animation:
-            status = "thinking"
-            self.logger.info("🤔 状态判断: THINKING (检测到加载动画)")
-        elif has_cursor_activity:
-            status = "waiting_input"
-            self.logger.info("⌨️ 状态判断: WAITING_INPUT (检测到光标活动)")
-        else:
-            status = "active"
-            self.logger.info("🟢 状态判断: ACTIVE (内容变化中)")
+                return "thinking"
+            # 正在停止中，但还没到30秒
+            remaining_time = max(0, self.min_static_duration - elapsed)
+            self.logger.info(f"🟡 状态判断: ACTIVE (停止中，还需 {remaining_time:.1f}秒到30秒)")
+            return "active"
         
-        # 输出简化的检测结果
-        self.logger.debug("📊 检测结果:")
-        self.logger.debug(f"   停止超过30秒: {is_truly_stopped}")
-        self.logger.debug(f"   停止计数: {self.static_counter}/{self.static_threshold}")
-        self.logger.debug(f"   光标活动: {has_cursor_activity}")
-        self.logger.debug(f"   加载动画: {has_loading_animation}")
-        self.logger.debug(f"   最终状态: {status}")
+        # 2. 画面有变化：在中部区域查找加载动画
+        has_loading_animation = self._loading_for_frame(gray)
+        detections['loading_animation'] = has_loading_animation
+        if has_loading_animation:
+            self.logger.debug("⏭️ 已检测到加载动画，跳过光标检测")
+            self.logger.info("🤔 状态判断: THINKING (检测到加载动画)")
+            return "thinking"
         
-        return status
+        # 3. 光标区域差分
+        has_cursor_activity = self.detect_cursor_activity(gray)
+        detections['cursor_activity'] = has_cursor_activity
+        if has_cursor_activity:
+            self.logger.info("⌨️ 状态判断: WAITING_INPUT (检测到光标活动)")
+            return "waiting_input"
+        self.logger.info("🟢 状态判断: ACTIVE (内容变化中)")
+        return "active"
+    
+    def _loading_for_frame(self, gray: Optional[np.ndarray]) -> bool:
+        """当前画面的加载动画检测结果，同一画面只检测一次 (gray 为 None 时复用上一帧的结果)"""
+        if self._frame_loading is None and gray is not None:
+            self._frame_loading = self.detect_loading_animation(gray)
+        return bool(self._frame_loading)
+    
+    def _ensure_foreground(self, window: gw.Win32Window, settle: float) -> bool:
+        """窗口不在前台时激活并等待 settle 秒；已在前台则直接返回 False"""
+        active = gw.getActiveWindow()
+        if active is not None and getattr(active, '_hWnd', None) == window._hWnd:
+            self.logger.debug("🎯 VS Code窗口已在前台，跳过激活")
+            return False
+        self.logger.info("🎯 激活VS Code窗口")
+        window.activate()
+        time.sleep(settle)
+        return True
     
     def check_chat_window_focus(self, window: gw.Win32Window) -> bool:
         """检查Chat窗口是否已经聚焦/打开"""
@@ -410,8 +695,7 @@ class FastCopilotMonitor:
             self.logger.debug("🔍 检查Chat窗口是否已打开")
             
             # 激活窗口
-            window.activate()
-            time.sleep(0.2)
+            self._ensure_foreground(window, 0.2)
             
             # 模拟一个很短的字符输入测试
             pyautogui.write(' ', interval=0.01)  # 输入一个空格
@@ -422,128 +706,162 @@ class FastCopilotMonitor:
             return True
             
         except Exception as e:
-            self.logger.debug(f"❌ Chat窗口检查失败: {e}")
+            self.logger.debug("❌ Chat窗口检查失败: %s", e)
             return False
     
     def find_chat_input_box(self, window: gw.Win32Window) -> Optional[Tuple[int, int]]:
         """智能查找Chat输入框位置"""
         try:
-            self.logger.debug("🔍 智能查找Chat输入框位置")
-            
-            # 截取整个VS Code窗口
-            screenshot = pyautogui.screenshot(region=(
-                window.left, window.top, window.width, window.height
-            ))
-            image = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # 重点搜索右侧区域 (Chat通常在右侧)
-            right_region_start = int(image.shape[1] * 0.6)  # 从60%宽度开始
-            right_region = gray[:, right_region_start:]
-            
-            # 查找输入框的特征：
-            # 1. 水平的长矩形区域
-            # 2. 通常在底部
-            # 3. 有明显的边界
+            rect = self._window_rect(window)
+            left, top, width, height = rect
+            
+            # 同样的窗口大小直接复用上次结果 (以窗口右下角为基准，窗口移动后仍然有效)
+            cached = self._input_pos_cache.get((width, height))
+            if cached is not None:
+                dx, dy = cached
+                self.logger.debug("📌 复用缓存的输入框位置偏移: (%d, %d)", dx, dy)
+                return (left + width + dx, top + height + dy)
+            
+            position, detected = self._detect_chat_input_box(rect)
+            # 只缓存真正检测到的位置；默认位置不缓存，下次仍重新检测 (如Chat面板暂时被隐藏)
+            if detected:
+                self._input_pos_cache[(width, height)] = (position[0] - left - width,
+                                                          position[1] - top - height)
+            return position
             
-            # 检测边缘
-            edges = cv2.Canny(right_region, 50, 150)
-            
-            # 查找水平线条 (输入框的上下边界)
-            horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-            horizontal_lines = cv2.morphologyEx(edges, cv2.MORPH_OPEN, horizontal_kernel)
-            
-            # 找到水平线的位置
-            horizontal_coords = np.where(horizontal_lines > 0)
-            
-            if len(horizontal_coords[0]) > 0:
-                # 找最底部的几条水平线 (输入框通常在底部)
-                bottom_lines = []
-                height = right_region.shape[0]
+        except Exception as e:
+            self.logger.warning(f"❌ 智能查找输入框失败: {e}")
+            return None
+    
+    def _detect_chat_input_box(self, rect: Tuple[int, int, int, int]) -> Tuple[Tuple[int, int], bool]:
+        """通过图像检测Chat输入框位置，返回 (位置, 是否检测成功)
+        
+        检测失败时位置为按窗口大小估算的默认位置；只有检测成功的结果才由 find_chat_input_box 按窗口大小缓存。
+        """
+        self.logger.debug("🔍 智能查找Chat输入框位置")
+        win_left, win_top, win_width, win_height = rect
+        
+        # 截取整个VS Code窗口
+        screenshot = pyautogui.screenshot(region=(
+            win_left, win_top, win_width, win_height
+        ))
+        image = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        
+        # 重点搜索右侧区域 (Chat通常在右侧)
+        right_region_start = int(image.shape[1] * 0.6)  # 从60%宽度开始
+        right_region = gray[:, right_region_start:]
+        
+        # 缩小后再做边缘检测，Canny和形态学运算量约减少16倍
+        scale = self.input_detect_scale
+        small = cv2.resize(right_region, (right_region.shape[1] // scale, right_region.shape[0] // scale),
+                           interpolation=cv2.INTER_AREA)
+        
+        # 查找输入框的特征：
+        # 1. 水平的长矩形区域
+        # 2. 通常在底部
+        # 3. 有明显的边界
+        
+        # 检测边缘
+        edges = cv2.Canny(small, 50, 150)
+        
+        # 查找水平线条 (输入框的上下边界)，核长度随缩放比例缩短
+        horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(1, 40 // scale), 1))
+        horizontal_lines = cv2.morphologyEx(edges, cv2.MORPH_OPEN, horizontal_kernel)
+        
+        # 找到水平线的位置
+        horizontal_coords = np.where(horizontal_lines > 0)
+        
+        if len(horizontal_coords[0]) > 0:
+            # 找最底部的几条水平线 (输入框通常在底部)
+            bottom_lines = []
+            height = small.shape[0]
+            
+            # 只考虑底部20%的区域，但不要太靠底部（避开状态栏）
+            bottom_threshold = int(height * 0.75)  # 从75%开始
+            status_bar_threshold = int(height * 0.95)  # 到95%结束，避开状态栏
+            
+            for i in range(len(horizontal_coords[0])):
+                y = horizontal_coords[0][i]
+                x = horizontal_coords[1][i]
                 
-                # 只考虑底部20%的区域，但不要太靠底部（避开状态栏）
-                bottom_threshold = int(height * 0.75)  # 从75%开始
-                status_bar_threshold = int(height * 0.95)  # 到95%结束，避开状态栏
+                if bottom_threshold < y < status_bar_threshold:  # 在底部区域但避开状态栏
+                    bottom_lines.append((x, y))
+            
+            # 需要足够的线条像素才认为是有效检测：阈值按原始分辨率的5个像素计，
+            # 缩小后沿线方向每个像素约对应原图 scale 个像素
+            if bottom_lines and len(bottom_lines) * scale > 5:
+                # 找到最常见的y坐标 (输入框的边界)
+                y_coords = [line[1] for line in bottom_lines]
+                y_coords.sort()
                 
-                for i in range(len(horizontal_coords[0])):
-                    y = horizontal_coords[0][i]
-                    x = horizontal_coords[1][i]
-                    
-                    if bottom_threshold < y < status_bar_threshold:  # 在底部区域但避开状态栏
-                        bottom_lines.append((x, y))
+                # 使用中位数位置，更稳定，换算回原始分辨率
+                median_index = len(y_coords) // 2
+                input_y_relative = int(y_coords[median_index]) * scale
                 
-                if bottom_lines and len(bottom_lines) > 5:  # 需要足够的线条才认为是有效检测
-                    # 找到最常见的y坐标 (输入框的边界)
-                    y_coords = [line[1] for line in bottom_lines]
-                    y_coords.sort()
-                    
-                    # 使用中位数位置，更稳定
-                    median_index = len(y_coords) // 2
-                    input_y_relative = y_coords[median_index]
-                    
-                    # 输入框通常在Chat面板的中央偏左
-                    input_x_relative = right_region.shape[1] // 2
-                    
-                    # 转换为绝对坐标 - 重要：需要向下偏移到输入框内部
-                    input_x = window.left + right_region_start + input_x_relative
-                    # 改为向下偏移25像素，确保点击到输入框中央区域
-                    input_y = window.top + input_y_relative + 25  
-                    
-                    # 额外验证：确保不会点击到状态栏区域
-                    if input_y < window.top + window.height - 50:  # 确保距离底部至少50像素
-                        self.logger.info(f"✅ 智能检测到输入框位置: ({input_x}, {input_y})")
-                        self.logger.debug(f"   检测基础: 找到{len(bottom_lines)}条线，向下偏移25px到输入框中央")
-                        return (input_x, input_y)
-                    else:
-                        self.logger.warning(f"⚠️ 智能检测位置太接近底部，放弃: y={input_y}, 窗口底部={window.top + window.height}")
+                # 输入框通常在Chat面板的中央偏左
+                input_x_relative = right_region.shape[1] // 2
+                
+                # 转换为绝对坐标 - 重要：需要向下偏移到输入框内部
+                input_x = win_left + right_region_start + input_x_relative
+                # 改为向下偏移25像素，确保点击到输入框中央区域
+                input_y = win_top + input_y_relative + 25  
+                
+                # 额外验证：确保不会点击到状态栏区域
+                if input_y < win_top + win_height - 50:  # 确保距离底部至少50像素
+                    self.logger.info(f"✅ 智能检测到输入框位置: ({input_x}, {input_y})")
+                    self.logger.debug("   检测基础: 找到%d条线，向下偏移25px到输入框中央", len(bottom_lines))
+                    return (input_x, input_y), True
                 else:
-                    self.logger.debug(f"⚠️ 底部线条不足({len(bottom_lines)}条)，智能检测失效")
-            
-            # 如果智能检测失败，使用改进的默认位置计算
-            self.logger.debug("⚠️ 智能检测失败，使用改进的默认位置")
-            
-            # 基于实际测试结果改进的位置计算
-            # Chat面板通常在右侧60%开始，占40%宽度
-            chat_region_start = int(window.width * 0.6)   # 从60%开始
-            chat_region_width = int(window.width * 0.4)   # Chat区域占40%
-            
-            # 输入框位置：Chat区域的中央偏左，距离底部更远避开状态栏
-            input_x_offset = int(chat_region_width * 0.5)  # Chat区域的50%位置（中央）
-            input_y_offset = window.height - 70  # 距离底部70像素，确保在输入框中央
-            
-            input_x = window.left + chat_region_start + input_x_offset
-            input_y = window.top + input_y_offset
-            
-            self.logger.info(f"✅ 使用改进默认位置: ({input_x}, {input_y})")
-            self.logger.debug(f"   计算基础: 窗口({window.width}x{window.height}), Chat区域从{chat_region_start}开始+{input_x_offset}, 距底部{window.height - input_y_offset}px")
-            
-            # 生成调试截图
-            if hasattr(self, '_debug_counter'):
-                self._debug_counter += 1
+                    self.logger.warning(f"⚠️ 智能检测位置太接近底部，放弃: y={input_y}, 窗口底部={win_top + win_height}")
             else:
-                self._debug_counter = 1
-            
-            # 每5次检测保存一次调试截图
-            if self._debug_counter % 5 == 1:
-                self._save_debug_screenshot_with_position(window, (input_x, input_y))
-            
-            return (input_x, input_y)
-            
-        except Exception as e:
-            self.logger.warning(f"❌ 智能查找输入框失败: {e}")
-            return None
+                self.logger.debug("⚠️ 底部线条不足(%d条)，智能检测失效", len(bottom_lines))
+        
+        # 如果智能检测失败，使用改进的默认位置计算
+        self.logger.debug("⚠️ 智能检测失败，使用改进的默认位置")
+        
+        # 基于实际测试结果改进的位置计算
+        # Chat面板通常在右侧60%开始，占40%宽度
+        chat_region_start = int(win_width * 0.6)   # 从60%开始
+        chat_region_width = int(win_width * 0.4)   # Chat区域占40%
+        
+        # 输入框位置：Chat区域的中央偏左，距离底部更远避开状态栏
+        input_x_offset = int(chat_region_width * 0.5)  # Chat区域的50%位置（中央）
+        input_y_offset = win_height - 70  # 距离底部70像素，确保在输入框中央
+        
+        input_x = win_left + chat_region_start + input_x_offset
+        input_y = win_top + input_y_offset
+        
+        self.logger.info(f"✅ 使用改进默认位置: ({input_x}, {input_y})")
+        if self._dbg:
+            self.logger.debug("   计算基础: 窗口(%dx%d), Chat区域从%d开始+%d, 距底部%dpx",
+                              win_width, win_height, chat_region_start, input_x_offset,
+                              win_height - input_y_offset)
+        
+        # 生成调试截图
+        if hasattr(self, '_debug_counter'):
+            self._debug_counter += 1
+        else:
+            self._debug_counter = 1
+        
+        # 每5次检测保存一次调试截图
+        if self._debug_counter % 5 == 1:
+            self._save_debug_screenshot_with_position(rect, (input_x, input_y))
+        
+        return (input_x, input_y), False
     
-    def _save_debug_screenshot_with_position(self, window: gw.Win32Window, position: Tuple[int, int]):
+    def _save_debug_screenshot_with_position(self, rect: Tuple[int, int, int, int], position: Tuple[int, int]):
         """保存带位置标记的调试截图"""
         try:
+            win_left, win_top, win_width, win_height = rect
             screenshot = pyautogui.screenshot(region=(
-                window.left, window.top, window.width, window.height
+                win_left, win_top, win_width, win_height
             ))
             debug_image = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
             
             # 计算相对坐标
-            rel_x = position[0] - window.left
-            rel_y = position[1] - window.top
+            rel_x = position[0] - win_left
+            rel_y = position[1] - win_top
             
             # 画标记
             cv2.circle(debug_image, (rel_x, rel_y), 15, (0, 255, 0), 3)  # 绿色圆圈 - 实际点击位置
@@ -585,9 +903,7 @@ class FastCopilotMonitor:
             self.logger.info("📤 准备发送命令...")
             
             # 确保窗口激活并等待
-            self.logger.info("🎯 激活VS Code窗口")
-            window.activate()
-            time.sleep(0.5)  # 增加等待时间
+            self._ensure_foreground(window, 0.5)
             
             # 方法1: 尝试直接在当前位置发送continue
             self.logger.info("🎯 方法1: 尝试在当前位置发送continue")
@@ -613,6 +929,33 @@ class FastCopilotMonitor:
         except Exception as e:
             self.logger.error(f"❌ 发送命令时出错: {e}")
             return False
+        finally:
+            self._restore_clipboard()
+    
+    def _paste_text(self, text: str, interval: float = 0.05):
+        """输入文本：优先写入剪贴板后 Ctrl+V 一次粘贴，中文也能正确输入"""
+        if pyperclip is None:
+            pyautogui.write(text, interval=interval)
+            return
+        
+        # 一次发送流程中只备份最初的剪贴板内容
+        if self._saved_clipboard is None:
+            try:
+                self._saved_clipboard = pyperclip.paste()
+            except Exception:
+                self._saved_clipboard = ''
+        pyperclip.copy(text)
+        pyautogui.hotkey('ctrl', 'v')
+    
+    def _restore_clipboard(self):
+        """恢复发送前的剪贴板内容"""
+        if self._saved_clipboard is None:
+            return
+        try:
+            pyperclip.copy(self._saved_clipboard)
+        except Exception as e:
+            self.logger.debug("恢复剪贴板失败: %s", e)
+        self._saved_clipboard = None
     
     def _try_send_continue_direct(self) -> bool:
         """尝试直接发送continue命令"""
@@ -638,7 +981,7 @@ class FastCopilotMonitor:
             time.sleep(0.1)
             
             # 输入continue命令
-            pyautogui.write(self.continue_command, interval=0.05)
+            self._paste_text(self.continue_command)
             time.sleep(0.5)
             
             # 按回车发送
@@ -646,8 +989,8 @@ class FastCopilotMonitor:
             time.sleep(0.3)
             
             self.logger.info("✅ 直接发送continue命令完成")
-            self.last_action_time = time.time()
-            self.detection_stats['commands_sent'] += 1
+            self._record_action()
+            self._stats[SENT] += 1
             return True
             
         except Exception as e:
@@ -671,15 +1014,15 @@ class FastCopilotMonitor:
                 
                 # 发送新窗口消息 (因为不确定现有窗口状态)
                 self.logger.info(f"📝 发送消息: '{self.new_window_message}'")
-                pyautogui.write(self.new_window_message, interval=0.05)
+                self._paste_text(self.new_window_message)
                 time.sleep(0.5)
                 pyautogui.press('enter')
                 time.sleep(0.3)
                 
                 self.logger.info(f"✅ 快捷键方法 {i+1} 发送成功")
-                self.last_action_time = time.time()
-                self.detection_stats['commands_sent'] += 1
-                self.detection_stats['new_windows_opened'] += 1
+                self._record_action()
+                self._stats[SENT] += 1
+                self._stats[NEW_WIN] += 1
                 return True
                 
             except Exception as e:
@@ -708,26 +1051,26 @@ class FastCopilotMonitor:
             
             for i, command in enumerate(chat_commands):
                 try:
-                    self.logger.debug(f"🔍 尝试命令: {command}")
+                    self.logger.debug("🔍 尝试命令: %s", command)
                     
                     # 清空命令面板并输入命令
                     pyautogui.hotkey('ctrl', 'a')
-                    pyautogui.write(command, interval=0.03)
+                    self._paste_text(command, interval=0.03)
                     time.sleep(0.5)
                     pyautogui.press('enter')
                     time.sleep(1.2)  # 等待Chat窗口打开
                     
                     # 发送消息
                     self.logger.info(f"📝 发送消息: '{self.new_window_message}'")
-                    pyautogui.write(self.new_window_message, interval=0.05)
+                    self._paste_text(self.new_window_message)
                     time.sleep(0.5)
                     pyautogui.press('enter')
                     time.sleep(0.3)
                     
                     self.logger.info(f"✅ 命令面板方法发送成功 (命令: {command})")
-                    self.last_action_time = time.time()
-                    self.detection_stats['commands_sent'] += 1
-                    self.detection_stats['new_windows_opened'] += 1
+                    self._record_action()
+                    self._stats[SENT] += 1
+                    self._stats[NEW_WIN] += 1
                     return True
                     
                 except Exception as e:
@@ -746,41 +1089,83 @@ class FastCopilotMonitor:
             self.logger.error(f"❌ 命令面板方法失败: {e}")
             return False
     
+    def _record_action(self):
+        """记录一次成功发送的时间"""
+        self.last_action_time = time.time()
+        self.last_action_monotonic = time.monotonic()
+    
+    def _time_since_last_action(self) -> float:
+        """距离上次发送的秒数（单调时钟，不受系统时间调整影响）"""
+        if self.last_action_monotonic is None:
+            return float('inf')
+        return time.monotonic() - self.last_action_monotonic
+    
+    def _next_check_interval(self, status: str) -> float:
+        """根据本轮状态选择下一次检测间隔"""
+        if status != self.last_status and status != "stopped":
+            # 刚检测到状态变化，缩短间隔以便更快响应
+            return self.fast_check_interval
+        if self.static_counter >= self.idle_backoff_ticks:
+            # 画面长时间不变，放宽间隔减少空转
+            return self.idle_check_interval
+        return self.check_interval
+    
+    def _set_state(self, state: str):
+        """切换监控状态并记录日志"""
+        if state != self._state:
+            self.logger.debug("🔀 监控状态: %s -> %s", self._state, state)
+            self._state = state
+    
+    def _wait_until(self, deadline: float):
+        """等待到指定的单调时钟截止时间，stop() 时立即返回"""
+        self._stop_event.wait(max(0.0, deadline - time.monotonic()))
+    
     def print_stats(self):
         """打印检测统计信息"""
-        stats = self.detection_stats
         self.logger.info("📊 检测统计:")
-        self.logger.info(f"   总检测次数: {stats['total_checks']}")
-        self.logger.info(f"   静态检测: {stats['static_detections']}")
-        self.logger.info(f"   光标活动: {stats['cursor_activities']}")
-        self.logger.info(f"   加载动画: {stats['loading_animations']}")
-        self.logger.info(f"   发送命令: {stats['commands_sent']}")
-        self.logger.info(f"   新窗口: {stats['new_windows_opened']}")
+        for label, value in zip(STAT_LABELS, self._stats.tolist()):
+            self.logger.info(f"   {label}: {value}")
     
     def monitor_loop(self):
         """主监控循环"""
         self.logger.info("🔍 开始监控循环...")
         
         while self.running:
+            tick_start = time.monotonic()
+            next_deadline = tick_start + self.check_interval
             try:
-                self.logger.debug("=" * 60)
-                self.logger.debug(f"🔄 第 {self.detection_stats['total_checks'] + 1} 次检测开始")
+                if self._state == 'COOLDOWN':
+                    # 冷却期内不检测，一次性等到冷却结束
+                    remaining = self.cooldown_time - self._time_since_last_action()
+                    if remaining > 0:
+                        self.logger.info(f"⏳ 冷却中，{remaining:.1f}秒后恢复检测")
+                        self._wait_until(tick_start + remaining)
+                        continue
+                    self._set_state('ACTIVE')
+                
+                if self._dbg:
+                    self.logger.debug("=" * 60)
+                    self.logger.debug("🔄 第 %d 次检测开始 [%s]", self._stats[TOTAL_CHECKS] + 1, self._state)
                 
                 window = self.find_vscode_window()
                 if not window:
                     self.logger.warning("⚠️ 等待VS Code窗口...")
-                    time.sleep(self.check_interval)
+                    self._set_state('SEARCHING')
+                    self._wait_until(next_deadline)
                     continue
                 
-                chat_image = self.capture_chat_area(window)
+                rect = self._window_rect(window)  # 本轮只读取一次窗口位置
+                chat_image = self.capture_chat_area(rect)
                 if chat_image is None:
                     self.logger.warning("❌ 无法截取聊天区域")
-                    time.sleep(self.check_interval)
+                    self._set_state('SEARCHING')
+                    self._wait_until(next_deadline)
                     continue
                 
+                # 检测流程由 static_counter 决定 (画面未变化时跳过部分检测)，状态只是结果标记
                 status = self.analyze_status_by_pixels(chat_image)
-                current_time = time.time()
-                time_since_last_action = current_time - self.last_action_time
+                self._set_state('STATIC_TIMING' if self.static_counter > 0 else 'ACTIVE')
+                time_since_last_action = self._time_since_last_action()
                 
                 self.logger.info(f"📊 当前状态: {status}, 距离上次操作: {time_since_last_action:.1f}秒")
                 
@@ -792,6 +1177,7 @@ class FastCopilotMonitor:
                         self.static_counter = 0
                         self.static_start_time = None  # 重置停止开始时间
                         self.last_screenshot_hash = None
+                        self._set_state('COOLDOWN')
                         self.print_stats()
                     else:
                         self.logger.error("❌ 命令发送失败")
@@ -800,27 +1186,39 @@ class FastCopilotMonitor:
                     self.logger.info(f"⏳ Copilot已停止，但仍在冷却期 (剩余: {remaining_time:.1f}秒)")
                 elif self.static_counter > 0:
                     # 显示停止进度
-                    elapsed = time.time() - self.static_start_time if self.static_start_time else 0
+                    elapsed = time.monotonic() - self.static_start_time if self.static_start_time else 0
                     remaining = max(0, self.min_static_duration - elapsed)
                     self.logger.info(f"⏱️ 停止进度: {elapsed:.1f}/{self.min_static_duration}秒 (还需 {remaining:.1f}秒)")
                 
                 # 每10次检测打印一次统计
-                if self.detection_stats['total_checks'] % 10 == 0:
+                if self._stats[TOTAL_CHECKS] % 10 == 0:
                     self.print_stats()
                 
-                self.logger.debug(f"😴 等待 {self.check_interval} 秒后继续检测")
-                time.sleep(self.check_interval)
+                interval = self._next_check_interval(status)
+                self.last_status = status
+                next_deadline = tick_start + interval
+                
+                self.logger.debug("😴 等待 %s 秒后继续检测", interval)
+                self._wait_until(next_deadline)
                 
-            except KeyboardInterrupt:
-                self.logger.info("⛔ 接收到停止信号")
-                break
             except Exception as e:
                 self.logger.error(f"❌ 监控循环出错: {e}")
-                time.sleep(self.check_interval)
+                self._wait_until(next_deadline)
+        
+        # mss实例绑定创建它的线程，在同一线程内释放
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
     
     def start(self):
         """启动监控"""
+        if self.running:
+            self.logger.warning("监控已在运行中")
+            return
+        
         self.running = True
+        self._stopped = False
+        self._stop_event.clear()
         print("🚀 Copilot监控工具启动 (30秒停止检测)")
         print(f"⚡ 每 {self.check_interval} 秒检测一次")
         print(f"⚡ 停止判断: 连续停止 {self.min_static_duration} 秒")
@@ -831,21 +1229,44 @@ class FastCopilotMonitor:
         print("📋 按 Ctrl+C 停止监控")
         print("=" * 50)
         
+        self.monitor_thread = threading.Thread(target=self.monitor_loop)
+        self.monitor_thread.daemon = True
+        self.monitor_thread.start()
+        
+        # 保持主线程运行，便于及时响应 Ctrl+C
         try:
-            self.monitor_loop()
+            while self.monitor_thread.is_alive():
+                self.monitor_thread.join(0.5)
         except KeyboardInterrupt:
             self.logger.info("⛔ 监控被用户中断")
         finally:
             self.stop()
     
     def stop(self):
-        """停止监控"""
+        """停止监控（可重复调用，只有第一次生效）"""
+        if self._stopped:
+            return
+        self._stopped = True
         self.running = False
+        self._stop_event.set()
+        
+        # 等监控线程退出后再保存状态，避免与线程同时读写检测字段
+        thread = self.monitor_thread
+        worker_alive = False
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(STOP_JOIN_TIMEOUT)
+            worker_alive = thread.is_alive()
+        if worker_alive:
+            self.logger.warning("⚠️ 监控线程未能及时退出，跳过保存检测状态")
+        else:
+            self._save_state()
         self.print_stats()
         self.logger.info("🛑 监控已停止")
 
 def main():
     """主函数"""
+    debug = '--debug' in sys.argv[1:] or os.environ.get('FAST_COPILOT_DEBUG') == '1'
+    
     print("🚀 VS Code Copilot Chat 监控工具")
     print("🎯 核心逻辑: 只要停止超过30秒，就认为Copilot停止了")
     print("=" * 50)
@@ -867,11 +1288,13 @@ def main():
     print("   • 详细日志显示停止进度和剩余时间")
     print()
     print("📋 需要的依赖：")
-    print("   pip install pyautogui pygetwindow opencv-python pillow")
+    print("   pip install pyautogui pygetwindow opencv-python pillow mss")
+    print()
+    print("🐞 调试：加 --debug 参数或设置 FAST_COPILOT_DEBUG=1 输出详细检测日志")
     print("=" * 50)
     print()
     
-    monitor = FastCopilotMonitor()
+    monitor = FastCopilotMonitor(debug=debug)
     
     try:
         monitor.start()
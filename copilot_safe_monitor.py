@@ -12,6 +12,25 @@ import threading
 from datetime import datetime
 import json
 import os
+import ctypes
+
+from copilot_monitor_common import optional_import, ClipboardHelper, VSCodeWindowCache, StdinLineReader
+
+# 用户活跃判断
+USER_IDLE_THRESHOLD_MS = 5000  # 最近5秒内有键盘/鼠标输入视为用户活跃
+ACTIVE_CACHE_TTL = 2.0         # 活跃检测结果缓存时间(秒)，同一次发送中不重复采样
+FOREGROUND_CACHE_TTL = 0.5     # 前台窗口检测结果缓存时间(秒)
+SEND_DEBOUNCE_SECONDS = 0.5    # 发送去抖窗口，窗口内的重复触发只发送一次
+CLIPBOARD_RESTORE_SECONDS = 30 # 复制命令后多久恢复原剪贴板，给用户留出粘贴时间
+PASTE_RESTORE_SECONDS = 1.0    # 自动粘贴后多久恢复原剪贴板
+INPUT_POLL_SECONDS = 0.25      # 交互输入的等待粒度，决定退出时的响应速度
+FOCUS_WAIT_SECONDS = 0.5       # 激活窗口后最多等待多久确认其到前台，超时按原来的固定等待继续
+FOCUS_POLL_SECONDS = 0.02      # 前台窗口轮询间隔
+PANEL_SETTLE_SECONDS = 0.5     # 快捷键后等待Chat面板获得焦点（面板切换不改变前台窗口，只能固定等待）
+
+class LASTINPUTINFO(ctypes.Structure):
+    """GetLastInputInfo 使用的结构体"""
+    _fields_ = [('cbSize', ctypes.c_uint), ('dwTime', ctypes.c_uint)]
 
 class SafeCopilotMonitor:
     """安全的Copilot监控器"""
@@ -29,6 +48,34 @@ class SafeCopilotMonitor:
         # 安全设置
         self.safe_mode = True  # 安全模式，避免干扰用户操作
         
+        # 可选依赖只在启动时解析一次，未安装的记为None
+        self._psutil = optional_import('psutil')
+        self._pyautogui = optional_import('pyautogui')
+        self._gw = optional_import('pygetwindow')
+        self._pyperclip = optional_import('pyperclip')
+        self._plyer = optional_import('plyer')
+        
+        # 活跃检测缓存 (时间戳, 结果)
+        self._active_cache = None
+        self._vscode_active_cache = None
+        self._prime_cpu_percent()
+        
+        # 发送去抖：定时器和手动send短时间内同时触发时只发送一次
+        self._pending_send_timer = None
+        self._pending_manual = False  # 合并的发送中是否有用户手动触发的
+        self._send_lock = threading.Lock()
+        # 发送进行中：剪贴板和按键操作不能交错，上一次没发完时跳过新的发送
+        self._sending = threading.Lock()
+        
+        # 停止事件：定时器线程在此等待到下一次发送时间，stop() 时立即唤醒
+        self._stop_event = threading.Event()
+        
+        # 缓存找到的VS Code窗口，句柄有效时不再重新枚举所有窗口
+        self._vscode_window = VSCodeWindowCache(self._gw)
+        
+        # 剪贴板复制和延迟恢复
+        self._clipboard = ClipboardHelper(self._pyperclip, self.logger)
+        
         self.logger.info("🛡️ 安全监控工具初始化完成")
         
     def setup_logging(self):
@@ -43,35 +90,80 @@ class SafeCopilotMonitor:
         )
         self.logger = logging.getLogger(__name__)
     
-    def is_user_active(self) -> bool:
-        """检测用户是否正在活跃操作"""
+    def _prime_cpu_percent(self):
+        """首次调用 cpu_percent(interval=None) 只建立基准，之后的调用立即返回"""
+        if self._psutil is None:
+            return
         try:
-            import psutil
+            self._psutil.cpu_percent(interval=None)
+        except Exception:
+            pass
+    
+    def get_idle_milliseconds(self):
+        """距离用户最后一次键盘/鼠标输入的毫秒数，非Windows或失败时返回None"""
+        if sys.platform != 'win32':
+            return None
+        try:
+            user32 = ctypes.windll.user32
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetTickCount.restype = ctypes.c_uint
             
-            # 检查CPU使用率（简单的活跃度指标）
-            cpu_percent = psutil.cpu_percent(interval=1)
+            info = LASTINPUTINFO()
+            info.cbSize = ctypes.sizeof(LASTINPUTINFO)
+            if not user32.GetLastInputInfo(ctypes.byref(info)):
+                return None
+            # GetTickCount 约49.7天回绕一次，按32位无符号数相减
+            return (kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+        except Exception as e:
+            self.logger.debug("获取输入空闲时间失败: %s", e)
+            return None
+    
+    def is_user_active(self) -> bool:
+        """检测用户是否正在活跃操作（结果缓存2秒）"""
+        now = time.monotonic()
+        if self._active_cache is not None and now - self._active_cache[0] < ACTIVE_CACHE_TTL:
+            return self._active_cache[1]
+        
+        active = self._check_user_active()
+        self._active_cache = (now, active)
+        return active
+    
+    def _check_user_active(self) -> bool:
+        """实际的活跃度检测：优先看最近的键盘/鼠标输入，取不到时退回CPU使用率"""
+        idle_ms = self.get_idle_milliseconds()
+        if idle_ms is not None:
+            if idle_ms < USER_IDLE_THRESHOLD_MS:
+                self.logger.debug("检测到用户活跃 (最近输入: %sms 前)", idle_ms)
+                return True
+            return False
+        
+        # 如果没有psutil，假设用户不活跃
+        if self._psutil is None:
+            return False
+        
+        try:
+            # 检查CPU使用率（简单的活跃度指标），非阻塞，返回自上次调用以来的平均值
+            cpu_percent = self._psutil.cpu_percent(interval=None)
             
             # 如果CPU使用率高，可能用户正在工作
             if cpu_percent > 20:
-                self.logger.debug(f"检测到用户活跃 (CPU: {cpu_percent}%)")
+                self.logger.debug("检测到用户活跃 (CPU: %s%%)", cpu_percent)
                 return True
                 
             return False
             
-        except ImportError:
-            # 如果没有psutil，假设用户不活跃
-            return False
         except Exception as e:
-            self.logger.debug(f"活跃度检测失败: {e}")
+            self.logger.debug("活跃度检测失败: %s", e)
             return False
     
     def get_current_window_title(self) -> str:
         """获取当前活动窗口标题"""
+        if self._gw is None:
+            return ""
+        
         try:
-            import pygetwindow as gw
-            
             # 获取当前活动窗口
-            active_window = gw.getActiveWindow()
+            active_window = self._gw.getActiveWindow()
             if active_window:
                 return active_window.title
             return ""
@@ -80,89 +172,108 @@ class SafeCopilotMonitor:
             return ""
     
     def is_vscode_active(self) -> bool:
-        """检查VS Code是否是当前活动窗口"""
+        """检查VS Code是否是当前活动窗口（结果缓存0.5秒）"""
+        now = time.monotonic()
+        if self._vscode_active_cache is not None and now - self._vscode_active_cache[0] < FOREGROUND_CACHE_TTL:
+            return self._vscode_active_cache[1]
+        
         current_title = self.get_current_window_title()
-        return 'Visual Studio Code' in current_title
+        active = 'Visual Studio Code' in current_title
+        self._vscode_active_cache = (now, active)
+        return active
     
-    def send_via_clipboard_safe(self) -> bool:
-        """安全的剪贴板方案"""
+    def send_via_clipboard_safe(self, user_active: bool = None) -> bool:
+        """安全的剪贴板方案
+        
+        user_active 由 send_continue_command 预先算好传入，为None时自行检测。
+        """
+        if self._pyperclip is None:
+            self.logger.debug("pyperclip 未安装")
+            return False
+        
         try:
-            import pyperclip
-            
             # 只有在安全的情况下才操作剪贴板
-            if self.safe_mode and self.is_user_active():
+            if user_active is None:
+                user_active = self.is_user_active()
+            if self.safe_mode and user_active:
                 self.logger.info("🛡️ 检测到用户活跃，跳过剪贴板操作（安全模式）")
                 return False
             
-            # 备份剪贴板
-            original_clipboard = ""
-            try:
-                original_clipboard = pyperclip.paste()
-            except:
-                pass
-            
-            # 复制命令
-            pyperclip.copy(self.continue_command)
+            # 复制命令，延迟恢复剪贴板给用户时间粘贴
+            self._clipboard.copy(self.continue_command, CLIPBOARD_RESTORE_SECONDS)
             
             self.logger.info("📋 continue命令已安全复制到剪贴板")
             self.logger.info("💡 请在方便时切换到VS Code Copilot Chat并粘贴")
             
-            # 延迟恢复剪贴板，给用户时间粘贴
-            def restore_clipboard():
-                time.sleep(30)  # 30秒后恢复
-                try:
-                    if original_clipboard:
-                        pyperclip.copy(original_clipboard)
-                        self.logger.debug("剪贴板已恢复")
-                except:
-                    pass
-            
-            # 在后台线程中恢复剪贴板
-            threading.Thread(target=restore_clipboard, daemon=True).start()
-            
             return True
             
-        except ImportError:
-            self.logger.debug("pyperclip 未安装")
-            return False
         except Exception as e:
-            self.logger.error(f"剪贴板操作失败: {e}")
+            self.logger.error("剪贴板操作失败: %s", e)
             return False
     
-    def send_via_automation_safe(self) -> bool:
-        """安全的自动化方案"""
+    def _wait_for_foreground(self, window):
+        """激活窗口后轮询前台窗口句柄，窗口到前台时立即返回
+        
+        超时只记录日志后继续，此时已经等了与原来固定等待相同的时间；
+        非Windows平台无法判断，直接固定等待。
+        """
+        if sys.platform != 'win32':
+            time.sleep(FOCUS_WAIT_SECONDS)
+            return
+        
+        user32 = ctypes.windll.user32
+        deadline = time.monotonic() + FOCUS_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            if user32.GetForegroundWindow() == window._hWnd:
+                return
+            time.sleep(FOCUS_POLL_SECONDS)
+        self.logger.debug("等待VS Code到前台超时，继续发送")
+    
+    def send_via_automation_safe(self, user_active: bool = None, vscode_active: bool = None) -> bool:
+        """安全的自动化方案
+        
+        user_active / vscode_active 由 send_continue_command 预先算好传入，为None时自行检测。
+        """
+        if self._pyautogui is None or self._gw is None:
+            self.logger.debug("自动化库未安装")
+            return False
+        pyautogui = self._pyautogui
+        
         try:
-            import pyautogui
-            import pygetwindow as gw
-            
             # 安全检查
             if self.safe_mode:
                 # 检查用户是否活跃
-                if self.is_user_active():
+                if user_active is None:
+                    user_active = self.is_user_active()
+                if user_active:
                     self.logger.info("🛡️ 检测到用户活跃，跳过自动化操作（安全模式）")
                     return False
                 
                 # 检查VS Code是否是活动窗口
-                if not self.is_vscode_active():
+                if vscode_active is None:
+                    vscode_active = self.is_vscode_active()
+                if not vscode_active:
                     self.logger.info("🛡️ VS Code不是活动窗口，跳过自动化操作（安全模式）")
                     return False
             
             # 查找VS Code窗口
-            windows = gw.getWindowsWithTitle('Visual Studio Code')
-            if not windows:
+            window = self._vscode_window.get()
+            if window is None:
                 self.logger.warning("⚠️ 未找到VS Code窗口")
                 return False
             
-            window = windows[0]
-            
             self.logger.info("🤖 安全发送continue命令...")
             
             # 确保窗口已经是活动的
             if not window.isActive:
                 # 只有在安全模式关闭时才切换窗口
                 if not self.safe_mode:
-                    window.activate()
-                    time.sleep(0.5)
+                    try:
+                        window.activate()
+                    except Exception:
+                        self._vscode_window.invalidate()
+                        raise
+                    self._wait_for_foreground(window)
                 else:
                     self.logger.info("🛡️ 安全模式：不切换窗口焦点")
                     return False
@@ -176,19 +287,19 @@ class SafeCopilotMonitor:
             
             for method in methods:
                 try:
-                    self.logger.debug(f"尝试快捷键: {'+'.join(method)}")
+                    self.logger.debug("尝试快捷键: %s", '+'.join(method))
                     pyautogui.hotkey(*method)
-                    time.sleep(0.5)
+                    time.sleep(PANEL_SETTLE_SECONDS)
                     
                     # 如果是命令面板，输入命令
                     if method == ('ctrl', 'shift', 'p'):
-                        pyautogui.write('Copilot Chat: Focus on Copilot Chat View', interval=0.02)
+                        self._clipboard.paste(pyautogui, 'Copilot Chat: Focus on Copilot Chat View', PASTE_RESTORE_SECONDS, interval=0.02)
                         pyautogui.press('enter')
-                        time.sleep(0.5)
+                        time.sleep(PANEL_SETTLE_SECONDS)
                     
                     # 输入continue命令
-                    pyautogui.write(self.continue_command, interval=0.03)
-                    time.sleep(0.3)
+                    self._clipboard.paste(pyautogui, self.continue_command, PASTE_RESTORE_SECONDS)
+                    time.sleep(0.05)
                     
                     # 发送
                     pyautogui.press('enter')
@@ -197,90 +308,135 @@ class SafeCopilotMonitor:
                     return True
                     
                 except Exception as e:
-                    self.logger.debug(f"方法 {method} 失败: {e}")
+                    self.logger.debug("方法 %s 失败: %s", method, e)
                     continue
             
             self.logger.warning("❌ 所有自动化方法都失败了")
             return False
             
-        except ImportError:
-            self.logger.debug("自动化库未安装")
-            return False
         except Exception as e:
-            self.logger.error(f"自动化发送失败: {e}")
+            self.logger.error("自动化发送失败: %s", e)
             return False
     
-    def send_notification_only(self) -> bool:
-        """仅发送通知，不执行任何操作"""
-        current_time = datetime.now().strftime("%H:%M:%S")
+    def send_notification_only(self, current_time: str = None) -> bool:
+        """仅发送通知，不执行任何操作
+        
+        current_time 由 send_continue_command 传入，避免同一次发送重复格式化时间。
+        """
+        if current_time is None:
+            current_time = datetime.now().strftime("%H:%M:%S")
         
         self.logger.info("🔔 " + "="*50)
-        self.logger.info(f"🕐 {current_time} - 是时候发送 continue 命令了！")
+        self.logger.info("🕐 %s - 是时候发送 continue 命令了！", current_time)
         self.logger.info("💡 请手动在VS Code Copilot Chat中输入: continue")
         self.logger.info("🔔 " + "="*50)
         
         # 可选：系统通知（如果支持）
-        try:
-            import plyer
-            plyer.notification.notify(
-                title="Copilot Chat 提醒",
-                message="是时候发送 continue 命令了！",
-                timeout=5
-            )
-        except ImportError:
-            pass
-        except Exception:
-            pass
+        if self._plyer is not None:
+            try:
+                self._plyer.notification.notify(
+                    title="Copilot Chat 提醒",
+                    message="是时候发送 continue 命令了！",
+                    timeout=5
+                )
+            except Exception:
+                pass
         
         return True
     
-    def send_continue_command(self) -> bool:
-        """安全发送continue命令"""
+    def send_continue_command(self, manual: bool = False) -> bool:
+        """安全发送continue命令
+        
+        manual=True 表示用户在本程序中输入 send 触发：输入命令本身就是最近的键盘输入，
+        不能据此判断用户正在操作，因此跳过活跃检测。
+        """
         if not self.enabled:
             return True
         
         current_time = datetime.now().strftime("%H:%M:%S")
-        self.logger.info(f"🕐 {current_time} - 准备安全发送continue命令")
+        self.logger.info("🕐 %s - 准备安全发送continue命令", current_time)
+        
+        # 安全检查只做一次：用户活跃时自动化和剪贴板都会被跳过，直接通知
+        user_active = self.is_user_active() if self.safe_mode and not manual else False
+        if user_active:
+            self.logger.info("🛡️ 检测到用户活跃，仅发送提醒（安全模式）")
+            return self.send_notification_only(current_time)
         
         # 方案1：尝试安全自动化
-        if self.send_via_automation_safe():
+        vscode_active = self.is_vscode_active() if self.safe_mode else None
+        if self.send_via_automation_safe(user_active, vscode_active):
             return True
         
         # 方案2：安全剪贴板
-        if self.send_via_clipboard_safe():
+        if self.send_via_clipboard_safe(user_active):
             return True
         
         # 方案3：仅通知
-        return self.send_notification_only()
+        return self.send_notification_only(current_time)
+    
+    def _debounced_send(self, manual: bool = False):
+        """去抖发送：取消尚未执行的发送，重新计时，以最后一次触发为准
+        
+        合并的请求中只要有一次是手动触发，就按手动发送处理。
+        """
+        with self._send_lock:
+            if self._pending_send_timer is not None:
+                self._pending_send_timer.cancel()
+                self.logger.debug("合并重复的发送请求")
+                manual = manual or self._pending_manual
+            self._pending_manual = manual
+            self._pending_send_timer = threading.Timer(SEND_DEBOUNCE_SECONDS, self._do_send)
+            self._pending_send_timer.daemon = True
+            self._pending_send_timer.start()
+    
+    def _do_send(self):
+        """去抖计时结束后真正执行发送"""
+        with self._send_lock:
+            self._pending_send_timer = None
+            manual = self._pending_manual
+        if not self._sending.acquire(blocking=False):
+            self.logger.info("⏳ 上一次发送尚未完成，跳过本次发送")
+            return
+        try:
+            self.send_continue_command(manual)
+        finally:
+            self._sending.release()
     
     def timer_thread(self):
-        """定时器线程"""
+        """定时器线程：一直睡到下一次发送时间，不再每10秒轮询"""
         next_send_time = time.time() + (self.interval_minutes * 60)
         
-        while self.running:
-            current_time = time.time()
+        while not self._stop_event.is_set():
+            delay = next_send_time - time.time()
+            if delay > 0:
+                self._stop_event.wait(delay)
+                continue
             
-            if current_time >= next_send_time and self.enabled:
-                self.send_continue_command()
-                next_send_time = current_time + (self.interval_minutes * 60)
-                
-                # 显示下次发送时间
-                next_time_str = datetime.fromtimestamp(next_send_time).strftime("%H:%M:%S")
-                self.logger.info(f"⏰ 下次发送时间: {next_time_str}")
+            if self.enabled:
+                self._debounced_send()
+            next_send_time = time.time() + (self.interval_minutes * 60)
             
-            time.sleep(10)
+            # 显示下次发送时间
+            next_time_str = time.strftime("%H:%M:%S", time.localtime(next_send_time))
+            self.logger.info("⏰ 下次发送时间: %s", next_time_str)
     
     def interactive_controls(self):
         """交互式控制"""
-        self.logger.info("💡 安全监控控制说明:")
-        self.logger.info("   help - 显示帮助")
-        self.logger.info("   quit - 退出程序")
-        self.logger.info("   safe on/off - 开启/关闭安全模式")
-        self.logger.info("   send - 立即发送命令")
+        self.logger.info("\n".join([
+            "💡 安全监控控制说明:",
+            "   help - 显示帮助",
+            "   quit - 退出程序",
+            "   safe on/off - 开启/关闭安全模式",
+            "   send - 立即发送命令",
+        ]))
         
-        while self.running:
+        reader = StdinLineReader(INPUT_POLL_SECONDS)
+        while self.running and not self._stop_event.is_set():
             try:
-                user_input = input().strip().lower()
+                line = reader.read_line()
+                if line is None:
+                    continue
+                user_input = line.strip().lower()
                 
                 if user_input in ['quit', 'q']:
                     self.running = False
@@ -294,7 +450,7 @@ class SafeCopilotMonitor:
                     self.enabled = False
                     self.logger.info("❌ 自动发送已禁用")
                 elif user_input in ['send', 's']:
-                    self.send_continue_command()
+                    self._debounced_send(manual=True)
                 elif user_input == 'safe on':
                     self.safe_mode = True
                     self.logger.info("🛡️ 安全模式已开启")
@@ -308,38 +464,52 @@ class SafeCopilotMonitor:
                         new_interval = int(user_input.split()[1])
                         if new_interval > 0:
                             self.interval_minutes = new_interval
-                            self.logger.info(f"⏰ 间隔已设置为 {new_interval} 分钟")
+                            self.logger.info("⏰ 间隔已设置为 %s 分钟", new_interval)
                     except (IndexError, ValueError):
                         self.logger.warning("⚠️ 格式错误，使用: interval <分钟数>")
                 elif user_input:
-                    self.logger.warning(f"❓ 未知命令: {user_input}")
+                    self.logger.warning("❓ 未知命令: %s", user_input)
                     
             except (EOFError, KeyboardInterrupt):
                 break
+        
+        reader.close()
     
     def show_help(self):
         """显示帮助"""
-        self.logger.info("📚 可用命令:")
-        self.logger.info("   help/h       - 显示此帮助")
-        self.logger.info("   quit/q       - 退出程序")
-        self.logger.info("   enable/e     - 启用自动发送")
-        self.logger.info("   disable/d    - 禁用自动发送")
-        self.logger.info("   send/s       - 立即发送continue命令")
-        self.logger.info("   safe on/off  - 开启/关闭安全模式")
-        self.logger.info("   status       - 显示当前状态")
-        self.logger.info("   interval <N> - 设置间隔为N分钟")
+        self.logger.info("\n".join([
+            "📚 可用命令:",
+            "   help/h       - 显示此帮助",
+            "   quit/q       - 退出程序",
+            "   enable/e     - 启用自动发送",
+            "   disable/d    - 禁用自动发送",
+            "   send/s       - 立即发送continue命令",
+            "   safe on/off  - 开启/关闭安全模式",
+            "   status       - 显示当前状态",
+            "   interval <N> - 设置间隔为N分钟",
+        ]))
     
     def show_status(self):
         """显示状态"""
-        self.logger.info("📊 当前状态:")
-        self.logger.info(f"   自动发送: {'启用' if self.enabled else '禁用'}")
-        self.logger.info(f"   安全模式: {'开启' if self.safe_mode else '关闭'}")
-        self.logger.info(f"   发送间隔: {self.interval_minutes} 分钟")
-        self.logger.info(f"   程序运行: {'是' if self.running else '否'}")
+        # 日志级别高于INFO时整段状态都不会输出，不必拼接
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self.logger.info("\n".join([
+            "📊 当前状态:",
+            "   自动发送: %s",
+            "   安全模式: %s",
+            "   发送间隔: %s 分钟",
+            "   程序运行: %s",
+        ]),
+            '启用' if self.enabled else '禁用',
+            '开启' if self.safe_mode else '关闭',
+            self.interval_minutes,
+            '是' if self.running else '否')
     
     def start(self):
         """启动监控"""
         self.running = True
+        self._stop_event.clear()
         
         # 启动定时器线程
         timer_thread = threading.Thread(target=self.timer_thread, daemon=True)
@@ -359,29 +529,41 @@ class SafeCopilotMonitor:
     def stop(self):
         """停止监控"""
         self.running = False
+        self._stop_event.set()
+        with self._send_lock:
+            if self._pending_send_timer is not None:
+                self._pending_send_timer.cancel()
+                self._pending_send_timer = None
+        # 退出前立即恢复剪贴板，不等定时器
+        self._clipboard.restore_now()
         self.logger.info("🛑 安全监控已停止")
 
+# 启动横幅，一次写出
+BANNER = "\n".join([
+    "🛡️ VS Code Copilot Chat 安全监控工具",
+    "=" * 60,
+    "✨ 特点：",
+    "   • 安全模式，不会干扰用户操作",
+    "   • 智能检测用户活跃状态",
+    "   • 多种发送方式自动切换",
+    "   • 完全可控的行为",
+    "",
+    "🛡️ 安全机制：",
+    "   • 检测用户是否正在操作",
+    "   • 避免在用户工作时发送命令",
+    "   • 不会强制切换窗口焦点",
+    "   • 优先使用剪贴板等安全方式",
+    "",
+    "💡 使用建议：",
+    "   • 建议保持安全模式开启",
+    "   • 如需完全自动化，可关闭安全模式",
+    "=" * 60,
+    "",
+]) + "\n"
+
 def main():
     """主函数"""
-    print("🛡️ VS Code Copilot Chat 安全监控工具")
-    print("=" * 60)
-    print("✨ 特点：")
-    print("   • 安全模式，不会干扰用户操作")
-    print("   • 智能检测用户活跃状态")
-    print("   • 多种发送方式自动切换")
-    print("   • 完全可控的行为")
-    print()
-    print("🛡️ 安全机制：")
-    print("   • 检测用户是否正在操作")
-    print("   • 避免在用户工作时发送命令")
-    print("   • 不会强制切换窗口焦点")
-    print("   • 优先使用剪贴板等安全方式")
-    print()
-    print("💡 使用建议：")
-    print("   • 建议保持安全模式开启")
-    print("   • 如需完全自动化，可关闭安全模式")
-    print("=" * 60)
-    print()
+    sys.stdout.write(BANNER)
     
     monitor = SafeCopilotMonitor()
     
@@ -12,6 +12,13 @@ import sys
 import threading
 from datetime import datetime
 
+from copilot_monitor_common import optional_import, ClipboardHelper, VSCodeWindowCache, StdinLineReader
+
+SEND_DEBOUNCE_SECONDS = 0.5  # 发送去抖窗口，窗口内的重复触发只发送一次
+PASTE_RESTORE_SECONDS = 1.0  # 自动粘贴后多久恢复原剪贴板
+CLIPBOARD_RESTORE_SECONDS = 5.0  # 复制命令后多久恢复原剪贴板，给用户留出粘贴时间
+INPUT_POLL_SECONDS = 0.25    # 交互输入的等待粒度，决定退出时的响应速度
+
 class TimerCopilotMonitor:
     """基于定时器的Copilot监控器"""
     
@@ -25,8 +32,28 @@ class TimerCopilotMonitor:
         self.interval_minutes = 2  # 每2分钟发送一次
         self.continue_command = 'continue'
         
+        # 可选依赖只在启动时解析一次，未安装的记为None
+        self._pyperclip = optional_import('pyperclip')
+        self._pyautogui = optional_import('pyautogui')
+        self._gw = optional_import('pygetwindow')
+        
+        # 发送去抖：定时器和手动send短时间内同时触发时只发送一次
+        self._pending_send_timer = None
+        self._send_lock = threading.Lock()
+        # 发送进行中：剪贴板和按键操作不能交错，上一次没发完时跳过新的发送
+        self._sending = threading.Lock()
+        
+        # 停止事件：定时器线程在此等待到下一次发送时间，stop() 时立即唤醒
+        self._stop_event = threading.Event()
+        
+        # 缓存找到的VS Code窗口，句柄有效时不再重新枚举所有窗口
+        self._vscode_window = VSCodeWindowCache(self._gw)
+        
+        # 剪贴板复制和延迟恢复
+        self._clipboard = ClipboardHelper(self._pyperclip, self.logger)
+        
         self.logger.info("🚀 定时器监控工具初始化完成")
-        self.logger.info(f"⏰ 设置间隔: {self.interval_minutes} 分钟")
+        self.logger.info("⏰ 设置间隔: %s 分钟", self.interval_minutes)
         
     def setup_logging(self):
         """设置日志"""
@@ -42,57 +69,43 @@ class TimerCopilotMonitor:
     
     def send_continue_via_clipboard(self) -> bool:
         """通过剪贴板发送continue命令"""
+        if self._pyperclip is None:
+            self.logger.warning("❌ pyperclip 未安装，无法使用剪贴板功能")
+            return False
+        
         try:
-            import pyperclip
-            
-            # 备份当前剪贴板内容
-            original_clipboard = ""
-            try:
-                original_clipboard = pyperclip.paste()
-            except:
-                pass
-            
-            # 将continue命令复制到剪贴板
-            pyperclip.copy(self.continue_command)
+            # 将continue命令复制到剪贴板，定时恢复原内容，不阻塞调用方
+            self._clipboard.copy(self.continue_command, CLIPBOARD_RESTORE_SECONDS)
             
             self.logger.info("📋 continue命令已复制到剪贴板")
             self.logger.info("💡 请手动切换到VS Code并粘贴(Ctrl+V)，然后按Enter发送")
             
-            # 等待用户操作
-            time.sleep(5)
-            
-            # 恢复原剪贴板内容
-            try:
-                if original_clipboard:
-                    pyperclip.copy(original_clipboard)
-            except:
-                pass
-            
             return True
             
-        except ImportError:
-            self.logger.warning("❌ pyperclip 未安装，无法使用剪贴板功能")
-            return False
         except Exception as e:
-            self.logger.error(f"❌ 剪贴板操作失败: {e}")
+            self.logger.error("❌ 剪贴板操作失败: %s", e)
             return False
     
     def send_continue_via_automation(self) -> bool:
         """通过自动化发送continue命令（需要额外库）"""
+        if self._pyautogui is None or self._gw is None:
+            self.logger.debug("自动化库未安装，跳过自动发送")
+            return False
+        pyautogui = self._pyautogui
+        
         try:
-            import pyautogui
-            import pygetwindow as gw
-            
             # 查找VS Code窗口
-            windows = gw.getWindowsWithTitle('Visual Studio Code')
-            if not windows:
+            window = self._vscode_window.get()
+            if window is None:
                 self.logger.warning("⚠️ 未找到VS Code窗口")
                 return False
             
-            window = windows[0]
-            
             # 激活窗口
-            window.activate()
+            try:
+                window.activate()
+            except Exception:
+                self._vscode_window.invalidate()
+                raise
             time.sleep(0.5)
             
             # 发送Ctrl+I打开Copilot Chat
@@ -100,7 +113,7 @@ class TimerCopilotMonitor:
             time.sleep(0.5)
             
             # 输入continue命令
-            pyautogui.write(self.continue_command, interval=0.03)
+            self._clipboard.paste(pyautogui, self.continue_command, PASTE_RESTORE_SECONDS)
             time.sleep(0.3)
             
             # 按Enter发送
@@ -109,11 +122,8 @@ class TimerCopilotMonitor:
             self.logger.info("✅ continue命令已自动发送")
             return True
             
-        except ImportError:
-            self.logger.debug("自动化库未安装，跳过自动发送")
-            return False
         except Exception as e:
-            self.logger.error(f"❌ 自动发送失败: {e}")
+            self.logger.error("❌ 自动发送失败: %s", e)
             return False
     
     def send_continue_command(self) -> bool:
@@ -122,7 +132,7 @@ class TimerCopilotMonitor:
             return True
         
         current_time = datetime.now().strftime("%H:%M:%S")
-        self.logger.info(f"🕐 {current_time} - 准备发送continue命令")
+        self.logger.info("🕐 %s - 准备发送continue命令", current_time)
         
         # 方法1：尝试自动化发送
         if self.send_continue_via_automation():
@@ -137,32 +147,61 @@ class TimerCopilotMonitor:
         self.logger.info("🎯 提示：您可以安装 pyautogui 和 pygetwindow 来启用自动发送功能")
         return True
     
+    def _debounced_send(self):
+        """去抖发送：取消尚未执行的发送，重新计时，以最后一次触发为准"""
+        with self._send_lock:
+            if self._pending_send_timer is not None:
+                self._pending_send_timer.cancel()
+                self.logger.debug("合并重复的发送请求")
+            self._pending_send_timer = threading.Timer(SEND_DEBOUNCE_SECONDS, self._do_send)
+            self._pending_send_timer.daemon = True
+            self._pending_send_timer.start()
+    
+    def _do_send(self):
+        """去抖计时结束后真正执行发送"""
+        with self._send_lock:
+            self._pending_send_timer = None
+        if not self._sending.acquire(blocking=False):
+            self.logger.info("⏳ 上一次发送尚未完成，跳过本次发送")
+            return
+        try:
+            self.send_continue_command()
+        finally:
+            self._sending.release()
+    
     def timer_thread(self):
-        """定时器线程"""
+        """定时器线程：一直睡到下一次发送时间，不再每10秒轮询"""
         next_send_time = time.time() + (self.interval_minutes * 60)
         
-        while self.running:
-            current_time = time.time()
+        while not self._stop_event.is_set():
+            delay = next_send_time - time.time()
+            if delay > 0:
+                self._stop_event.wait(delay)
+                continue
             
-            if current_time >= next_send_time and self.enabled:
-                self.send_continue_command()
-                next_send_time = current_time + (self.interval_minutes * 60)
-                
-                # 显示下次发送时间
-                next_time_str = datetime.fromtimestamp(next_send_time).strftime("%H:%M:%S")
-                self.logger.info(f"⏰ 下次发送时间: {next_time_str}")
+            if self.enabled:
+                self._debounced_send()
+            next_send_time = time.time() + (self.interval_minutes * 60)
             
-            time.sleep(10)  # 每10秒检查一次
+            # 显示下次发送时间
+            next_time_str = time.strftime("%H:%M:%S", time.localtime(next_send_time))
+            self.logger.info("⏰ 下次发送时间: %s", next_time_str)
     
     def interactive_controls(self):
         """交互式控制"""
-        self.logger.info("💡 交互式控制说明:")
-        self.logger.info("   输入 'help' 查看所有命令")
-        self.logger.info("   输入 'quit' 退出程序")
+        self.logger.info("\n".join([
+            "💡 交互式控制说明:",
+            "   输入 'help' 查看所有命令",
+            "   输入 'quit' 退出程序",
+        ]))
         
-        while self.running:
+        reader = StdinLineReader(INPUT_POLL_SECONDS)
+        while self.running and not self._stop_event.is_set():
             try:
-                user_input = input().strip().lower()
+                line = reader.read_line()
+                if line is None:
+                    continue
+                user_input = line.strip().lower()
                 
                 if user_input == 'quit' or user_input == 'q':
                     self.logger.info("🛑 用户请求退出")
@@ -177,7 +216,7 @@ class TimerCopilotMonitor:
                     self.enabled = False
                     self.logger.info("❌ 自动发送已禁用")
                 elif user_input == 'send' or user_input == 's':
-                    self.send_continue_command()
+                    self._debounced_send()
                 elif user_input == 'status':
                     self.show_status()
                 elif user_input.startswith('interval '):
@@ -185,46 +224,56 @@ class TimerCopilotMonitor:
                         new_interval = int(user_input.split()[1])
                         if new_interval > 0:
                             self.interval_minutes = new_interval
-                            self.logger.info(f"⏰ 间隔已设置为 {new_interval} 分钟")
+                            self.logger.info("⏰ 间隔已设置为 %s 分钟", new_interval)
                         else:
                             self.logger.warning("⚠️ 间隔必须大于0")
                     except (IndexError, ValueError):
                         self.logger.warning("⚠️ 格式错误，使用: interval <分钟数>")
                 elif user_input:
-                    self.logger.warning(f"❓ 未知命令: {user_input}，输入 'help' 查看帮助")
+                    self.logger.warning("❓ 未知命令: %s，输入 'help' 查看帮助", user_input)
                     
             except (EOFError, KeyboardInterrupt):
                 break
+        
+        reader.close()
     
     def show_help(self):
         """显示帮助信息"""
-        self.logger.info("📚 可用命令:")
-        self.logger.info("   help, h      - 显示此帮助")
-        self.logger.info("   quit, q      - 退出程序")
-        self.logger.info("   enable, e    - 启用自动发送")
-        self.logger.info("   disable, d   - 禁用自动发送")
-        self.logger.info("   send, s      - 立即发送continue命令")
-        self.logger.info("   status       - 显示当前状态")
-        self.logger.info("   interval <N> - 设置间隔为N分钟")
+        self.logger.info("\n".join([
+            "📚 可用命令:",
+            "   help, h      - 显示此帮助",
+            "   quit, q      - 退出程序",
+            "   enable, e    - 启用自动发送",
+            "   disable, d   - 禁用自动发送",
+            "   send, s      - 立即发送continue命令",
+            "   status       - 显示当前状态",
+            "   interval <N> - 设置间隔为N分钟",
+        ]))
     
     def show_status(self):
         """显示当前状态"""
+        # 日志级别高于INFO时整段状态都不会输出，不必拼接
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         status = "启用" if self.enabled else "禁用"
-        self.logger.info(f"📊 当前状态:")
-        self.logger.info(f"   自动发送: {status}")
-        self.logger.info(f"   发送间隔: {self.interval_minutes} 分钟")
-        self.logger.info(f"   程序运行: {'是' if self.running else '否'}")
+        self.logger.info("\n".join([
+            "📊 当前状态:",
+            "   自动发送: %s",
+            "   发送间隔: %s 分钟",
+            "   程序运行: %s",
+        ]), status, self.interval_minutes, '是' if self.running else '否')
     
     def start(self):
         """启动监控"""
         self.running = True
+        self._stop_event.clear()
         
         # 启动定时器线程
         timer_thread = threading.Thread(target=self.timer_thread, daemon=True)
         timer_thread.start()
         
         self.logger.info("🚀 定时器监控已启动")
-        self.logger.info(f"⏰ 将每 {self.interval_minutes} 分钟自动处理continue命令")
+        self.logger.info("⏰ 将每 %s 分钟自动处理continue命令", self.interval_minutes)
         self.show_status()
         print("\n" + "="*50)
         
@@ -239,34 +288,46 @@ class TimerCopilotMonitor:
     def stop(self):
         """停止监控"""
         self.running = False
+        self._stop_event.set()
+        # 退出前立即恢复剪贴板，不等定时器
+        self._clipboard.restore_now()
+        with self._send_lock:
+            if self._pending_send_timer is not None:
+                self._pending_send_timer.cancel()
+                self._pending_send_timer = None
         self.logger.info("🛑 定时器监控已停止")
 
+# 启动横幅，一次写出
+BANNER = "\n".join([
+    "🚀 VS Code Copilot Chat 定时器监控工具",
+    "=" * 60,
+    "✨ 特点：",
+    "   • 完全无需安装OCR或其他复杂软件",
+    "   • 简单的定时器机制",
+    "   • 支持自动发送或剪贴板辅助",
+    "   • 交互式控制界面",
+    "",
+    "🎯 工作原理：",
+    "   1. 每隔指定时间（默认2分钟）",
+    "   2. 自动发送continue命令到VS Code Copilot Chat",
+    "   3. 或者将命令复制到剪贴板供您手动粘贴",
+    "",
+    "💡 优势：",
+    "   • 无需复杂的状态检测",
+    "   • 不依赖屏幕截图或OCR",
+    "   • 轻量级，资源占用极少",
+    "   • 可以完全控制发送频率",
+    "",
+    "⚠️  注意：",
+    "   • 确保VS Code和Copilot Chat正在运行",
+    "   • 可选安装pyautogui和pygetwindow以启用完全自动化",
+    "=" * 60,
+    "",
+]) + "\n"
+
 def main():
     """主函数"""
-    print("🚀 VS Code Copilot Chat 定时器监控工具")
-    print("=" * 60)
-    print("✨ 特点：")
-    print("   • 完全无需安装OCR或其他复杂软件")
-    print("   • 简单的定时器机制")
-    print("   • 支持自动发送或剪贴板辅助")
-    print("   • 交互式控制界面")
-    print()
-    print("🎯 工作原理：")
-    print("   1. 每隔指定时间（默认2分钟）")
-    print("   2. 自动发送continue命令到VS Code Copilot Chat")
-    print("   3. 或者将命令复制到剪贴板供您手动粘贴")
-    print()
-    print("💡 优势：")
-    print("   • 无需复杂的状态检测")
-    print("   • 不依赖屏幕截图或OCR")
-    print("   • 轻量级，资源占用极少")
-    print("   • 可以完全控制发送频率")
-    print()
-    print("⚠️  注意：")
-    print("   • 确保VS Code和Copilot Chat正在运行")
-    print("   • 可选安装pyautogui和pygetwindow以启用完全自动化")
-    print("=" * 60)
-    print()
+    sys.stdout.write(BANNER)
     
     monitor = TimerCopilotMonitor()
     
@@ -6,14 +6,53 @@ VS Code Copilot Chat 监控工具调试脚本
 """
 
 import time
-import cv2
-import numpy as np
-import pyautogui
-import pygetwindow as gw
-import pytesseract
-from PIL import Image
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# cv2/numpy/pyautogui/pygetwindow/pytesseract/PIL 较重且可能未安装，
+# 只在用到它们的函数内导入，缺失的依赖统一由 check_dependencies 报告
+
+# 复用的 tesserocr 实例，首次OCR时创建
+_tess_api = None
+
+# 复用的 mss 截图实例，首次截图时创建
+_sct = None
+
+def get_screen_grabber():
+    """获取复用的 mss 截图实例"""
+    global _sct
+    if _sct is None:
+        import mss
+        _sct = mss.mss()
+    return _sct
+
+def grab_region(left, top, width, height):
+    """截取屏幕区域，返回 HxWx3 的BGR图像
+    
+    mss 直接返回BGRA原始数据，这里只包装成数组视图并去掉alpha通道，不拷贝像素。
+    """
+    import numpy as np
+    
+    shot = get_screen_grabber().grab({'left': left, 'top': top, 'width': width, 'height': height})
+    frame = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+    return frame[:, :, :3]
+
+def get_tesserocr_api():
+    """获取复用的 tesserocr 实例 (--oem 3 --psm 6 -l eng)，不可用时返回None"""
+    global _tess_api
+    if _tess_api is None:
+        try:
+            import tesserocr  # 可选：进程内调用Tesseract，不必每次启动子进程、写临时文件
+        except ImportError:
+            return None
+        try:
+            _tess_api = tesserocr.PyTessBaseAPI(lang='eng', psm=tesserocr.PSM.SINGLE_BLOCK,
+                                                oem=tesserocr.OEM.DEFAULT)
+        except Exception as e:
+            print(f"⚠️ tesserocr 初始化失败，改用 pytesseract: {e}")
+            return None
+    return _tess_api
 
 def check_dependencies():
     """检查依赖项是否正确安装"""
@@ -40,6 +79,13 @@ def check_dependencies():
         print("❌ PyGetWindow 未安装")
         return False
     
+    try:
+        import mss
+        print(f"✅ mss: {mss.__version__}")
+    except ImportError:
+        print("❌ mss 未安装")
+        return False
+    
     try:
         import pytesseract
         # 测试Tesseract是否可用
@@ -56,6 +102,8 @@ def find_windows():
     """查找所有窗口，特别是VS Code相关的"""
     print("\n🔍 查找窗口...")
     
+    import pygetwindow as gw
+    
     all_windows = gw.getAllWindows()
     vscode_windows = []
     
@@ -85,13 +133,14 @@ def test_screenshot():
     print("\n📸 测试屏幕截图...")
     
     try:
-        # 测试全屏截图
-        screenshot = pyautogui.screenshot()
-        print(f"✅ 屏幕截图成功: {screenshot.size}")
+        # 测试全屏截图（主显示器）
+        monitor = get_screen_grabber().monitors[1]
+        screenshot = grab_region(monitor['left'], monitor['top'], monitor['width'], monitor['height'])
+        print(f"✅ 屏幕截图成功: {(screenshot.shape[1], screenshot.shape[0])}")
         
         # 保存测试截图
         test_file = "test_screenshot.png"
-        screenshot.save(test_file)
+        save_image(test_file, screenshot)
         print(f"✅ 测试截图已保存: {test_file}")
         
         return True
@@ -99,6 +148,13 @@ def test_screenshot():
         print(f"❌ 屏幕截图失败: {e}")
         return False
 
+def save_image(path, image):
+    """保存图像；切片得到的视图在这里才拷贝成连续内存"""
+    import cv2
+    import numpy as np
+    
+    cv2.imwrite(path, np.ascontiguousarray(image))
+
 def test_vscode_detection(vscode_windows):
     """测试VS Code窗口检测和截图"""
     if not vscode_windows:
@@ -106,6 +162,8 @@ def test_vscode_detection(vscode_windows):
     
     print("\n🎯 测试 VS Code 窗口检测...")
     
+    # 截图需要逐个激活窗口，只能串行；保存到磁盘放到最后并行执行
+    captures = []
     for i, window in enumerate(vscode_windows):
         try:
             print(f"\n测试窗口 {i+1}: '{window.title}'")
@@ -118,26 +176,31 @@ def test_vscode_detection(vscode_windows):
             left, top, width, height = window.left, window.top, window.width, window.height
             print(f"窗口区域: ({left}, {top}, {width}, {height})")
             
-            # 截取窗口区域
-            screenshot = pyautogui.screenshot(region=(left, top, width, height))
+            # 截取窗口区域 (mss每次返回新的缓冲区，稍后并行保存时互不影响)
+            screenshot = grab_region(left, top, width, height)
+            captures.append((i, screenshot, width))
             
-            # 保存窗口截图
+        except Exception as e:
+            print(f"❌ 处理窗口 {i+1} 时出错: {e}")
+    
+    # 并行保存窗口截图和聊天区域截图（拷贝和编码都在工作线程中完成）
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = {}
+        for i, screenshot, width in captures:
             window_file = f"vscode_window_{i+1}.png"
-            screenshot.save(window_file)
-            print(f"✅ VS Code 窗口截图已保存: {window_file}")
+            futures[executor.submit(save_image, window_file, screenshot)] = f"✅ VS Code 窗口截图已保存: {window_file}"
             
-            # 截取右半部分（假设聊天区域在右侧）
-            img_array = np.array(screenshot)
-            img_bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-            chat_area = img_bgr[:, width//2:]
-            
-            # 保存聊天区域截图
+            # 截取右半部分（假设聊天区域在右侧），只是视图切片
             chat_file = f"chat_area_{i+1}.png"
-            cv2.imwrite(chat_file, chat_area)
-            print(f"✅ 聊天区域截图已保存: {chat_file}")
-            
-        except Exception as e:
-            print(f"❌ 处理窗口 {i+1} 时出错: {e}")
+            chat_area = screenshot[:, width//2:]
+            futures[executor.submit(save_image, chat_file, chat_area)] = f"✅ 聊天区域截图已保存: {chat_file}"
+        
+        for future in as_completed(futures):
+            try:
+                future.result()
+                print(futures[future])
+            except Exception as e:
+                print(f"❌ 保存截图时出错: {e}")
     
     return True
 
@@ -146,9 +209,10 @@ def test_ocr():
     print("\n📝 测试OCR识别...")
     
     try:
+        from PIL import Image, ImageDraw, ImageFont
+        
         # 创建一个测试图像
         test_img = Image.new('RGB', (400, 200), color='white')
-        from PIL import ImageDraw, ImageFont
         
         draw = ImageDraw.Draw(test_img)
         try:
@@ -165,9 +229,15 @@ def test_ocr():
         test_img.save("test_ocr_image.png")
         print("✅ 测试OCR图像已创建: test_ocr_image.png")
         
-        # 进行OCR识别
-        custom_config = r'--oem 3 --psm 6 -l eng'
-        recognized_text = pytesseract.image_to_string(test_img, config=custom_config)
+        # 进行OCR识别：优先进程内的 tesserocr，否则通过 pytesseract 调用命令行
+        api = get_tesserocr_api()
+        if api is not None:
+            api.SetImage(test_img)
+            recognized_text = api.GetUTF8Text()
+        else:
+            import pytesseract
+            custom_config = r'--oem 3 --psm 6 -l eng'
+            recognized_text = pytesseract.image_to_string(test_img, config=custom_config)
         
         print(f"📄 OCR识别结果:")
         print(f"原文: {test_text}")
@@ -189,6 +259,8 @@ def test_automation():
     print("\n🤖 测试自动化功能...")
     
     try:
+        import pyautogui
+        
         # 获取当前鼠标位置
         current_pos = pyautogui.position()
         print(f"当前鼠标位置: {current_pos}")
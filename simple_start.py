@@ -7,14 +7,22 @@ VS Code Copilot Chat 简化启动器
 
 import os
 import sys
-import subprocess
+from importlib.util import find_spec
+
+# 分隔线
+SEPARATOR = "=" * 60
+
+# 横幅文本
+BANNER = (
+    "🚀 VS Code Copilot Chat 监控工具 - 简化版\n"
+    + SEPARATOR + "\n"
+    + "✨ 无需安装OCR软件的解决方案\n"
+    + SEPARATOR + "\n"
+)
 
 def print_banner():
     """打印横幅"""
-    print("🚀 VS Code Copilot Chat 监控工具 - 简化版")
-    print("=" * 60)
-    print("✨ 无需安装OCR软件的解决方案")
-    print("=" * 60)
+    sys.stdout.write(BANNER)
 
 def check_dependencies():
     """检查依赖"""
@@ -27,14 +35,13 @@ def check_dependencies():
         'pyperclip': '剪贴板操作库（可选）'
     }
     
+    # 只查找模块是否存在，不执行模块初始化
     available = {}
     for dep, desc in dependencies.items():
-        try:
-            __import__(dep)
-            available[dep] = True
+        available[dep] = find_spec(dep) is not None
+        if available[dep]:
             print(f"✅ {dep}: 已安装 - {desc}")
-        except ImportError:
-            available[dep] = False
+        else:
             print(f"❌ {dep}: 未安装 - {desc}")
     
     return available
@@ -49,53 +56,82 @@ def install_optional_dependencies():
         'pyperclip'
     ]
     
-    for package in packages:
-        try:
-            print(f"正在安装 {package}...")
-            subprocess.check_call([sys.executable, '-m', 'pip', 'install', package])
-            print(f"✅ {package} 安装成功")
-        except subprocess.CalledProcessError:
-            print(f"❌ {package} 安装失败")
-        except Exception as e:
-            print(f"❌ 安装 {package} 时出错: {e}")
+    # 一次pip调用安装全部包，只启动一次pip、只做一次依赖解析
+    try:
+        import subprocess
+        print(f"正在安装 {', '.join(packages)}...")
+        result = subprocess.run([sys.executable, '-m', 'pip', 'install',
+                                 '--disable-pip-version-check', '--no-input', *packages])
+    except Exception as e:
+        print(f"❌ 安装时出错: {e}")
+        return
+    
+    if result.returncode == 0:
+        print("✅ 全部安装成功")
+        return
+    
+    # 失败时逐个查找模块，报告仍未安装的包
+    failed = [package for package in packages if find_spec(package) is None]
+    if failed:
+        print(f"❌ 以下包安装失败: {', '.join(failed)}")
+    else:
+        print("⚠️ pip 返回错误，但所有包均已可用")
+
+# 显示选项菜单的文本，只构建一次
+MENU_TEXT = "\n".join([
+    "\n🎯 可用的监控方案:",
+    "",
+    "1️⃣  定时器方案 (推荐)",
+    "   • 完全无需额外软件",
+    "   • 定期自动发送continue命令",
+    "   • 支持交互式控制",
+    "   • 最简单可靠",
+    "",
+    "2️⃣  热键方案",
+    "   • 需要: keyboard库",
+    "   • 全局热键控制",
+    "   • 手动+自动两种模式",
+    "   • 需要管理员权限",
+    "",
+    "3️⃣  图像检测方案",
+    "   • 需要: pyautogui, pygetwindow",
+    "   • 不需要OCR",
+    "   • 基于像素变化检测",
+    "   • 相对复杂但智能",
+    "",
+    "4️⃣  安装推荐依赖",
+    "   • 安装pyautogui、pygetwindow等",
+    "   • 启用完整自动化功能",
+    "",
+    "5️⃣  依赖检查",
+    "   • 检查当前已安装的库",
+    "",
+    "0️⃣  退出",
+    "",
+]) + "\n"
 
 def show_options():
     """显示选项菜单"""
-    print("\n🎯 可用的监控方案:")
-    print()
-    
-    print("1️⃣  定时器方案 (推荐)")
-    print("   • 完全无需额外软件")
-    print("   • 定期自动发送continue命令")
-    print("   • 支持交互式控制")
-    print("   • 最简单可靠")
-    print()
-    
-    print("2️⃣  热键方案")
-    print("   • 需要: keyboard库")
-    print("   • 全局热键控制")
-    print("   • 手动+自动两种模式")
-    print("   • 需要管理员权限")
-    print()
-    
-    print("3️⃣  图像检测方案")
-    print("   • 需要: pyautogui, pygetwindow")
-    print("   • 不需要OCR")
-    print("   • 基于像素变化检测")
-    print("   • 相对复杂但智能")
-    print()
-    
-    print("4️⃣  安装推荐依赖")
-    print("   • 安装pyautogui、pygetwindow等")
-    print("   • 启用完整自动化功能")
-    print()
-    
-    print("5️⃣  依赖检查")
-    print("   • 检查当前已安装的库")
-    print()
+    sys.stdout.write(MENU_TEXT)
+    sys.stdout.flush()
+
+def launch_script(script):
+    """运行监控脚本
+    
+    POSIX下用 os.execv 直接替换当前进程，启动器不再常驻内存；
+    Windows的 execv 实际是新建进程后退出，会与控制台抢输入，仍以子进程运行；
+    execv 失败时提示原因后同样退回子进程。
+    """
+    if os.name == 'posix':
+        input("按回车键启动（将替换当前进程，不再返回菜单）...")
+        sys.stdout.flush()
+        try:
+            os.execv(sys.executable, [sys.executable, script])
+        except OSError as e:
+            print(f"⚠️ 无法替换当前进程 ({e})，改为以子进程运行")
     
-    print("0️⃣  退出")
-    print()
+    import subprocess
+    subprocess.run([sys.executable, script])
 
 def run_timer_monitor():
     """运行定时器监控"""
@@ -110,7 +146,7 @@ def run_timer_monitor():
             return
         
         # 运行定时器监控
-        subprocess.run([sys.executable, 'copilot_timer_monitor.py'])
+        launch_script('copilot_timer_monitor.py')
     except KeyboardInterrupt:
         print("\n✅ 定时器监控已停止")
     except Exception as e:
@@ -133,7 +169,7 @@ def run_hotkey_monitor():
             return
         
         print("⚠️  需要管理员权限运行以支持全局热键")
-        subprocess.run([sys.executable, 'copilot_hotkey_monitor.py'])
+        launch_script('copilot_hotkey_monitor.py')
     except KeyboardInterrupt:
         print("\n✅ 热键监控已停止")
     except Exception as e:
@@ -170,12 +206,25 @@ def run_simple_monitor():
             print("❌ 找不到 copilot_monitor_simple.py 文件")
             return
         
-        subprocess.run([sys.executable, 'copilot_monitor_simple.py'])
+        launch_script('copilot_monitor_simple.py')
     except KeyboardInterrupt:
         print("\n✅ 图像监控已停止")
     except Exception as e:
         print(f"❌ 运行出错: {e}")
 
+def invalid_choice():
+    """无效的菜单选择"""
+    print("❌ 无效选择，请输入0-5")
+
+# 菜单选项 -> 处理函数
+MENU_HANDLERS = {
+    '1': run_timer_monitor,
+    '2': run_hotkey_monitor,
+    '3': run_simple_monitor,
+    '4': install_optional_dependencies,
+    '5': check_dependencies,
+}
+
 def main():
     """主函数"""
     print_banner()
@@ -189,21 +238,10 @@ def main():
             if choice == '0':
                 print("👋 再见！")
                 break
-            elif choice == '1':
-                run_timer_monitor()
-            elif choice == '2':
-                run_hotkey_monitor()
-            elif choice == '3':
-                run_simple_monitor()
-            elif choice == '4':
-                install_optional_dependencies()
-            elif choice == '5':
-                check_dependencies()
-            else:
-                print("❌ 无效选择，请输入0-5")
+            MENU_HANDLERS.get(choice, invalid_choice)()
             
             input("\n按回车键继续...")
-            print("\n" + "="*60)
+            print("\n" + SEPARATOR)
             
         except KeyboardInterrupt:
             print("\n👋 程序被中断，再见！")
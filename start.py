@@ -7,85 +7,113 @@ VS Code GitHub Copilot Chat 自动监控工具 - 主启动脚本
 
 import sys
 import os
+import functools
+import py_compile
+import shutil
+import threading
+from importlib.metadata import version, PackageNotFoundError
+from importlib.util import find_spec
 
+# (模块名, pip包名)
+REQUIRED_PACKAGES = [
+    ("cv2", "opencv-python"),
+    ("numpy", "numpy"),
+    ("pyautogui", "pyautogui"),
+    ("pygetwindow", "pygetwindow"),
+    ("pytesseract", "pytesseract"),
+    ("PIL", "Pillow"),
+]
 
+# 菜单中会导入的监控模块
+MONITOR_MODULES = ("copilot_monitor.py", "copilot_monitor_advanced.py", "copilot_monitor_gui.py")
+
+# 已检测到的Tesseract版本，避免重复启动tesseract进程
+_TESSERACT_VERSION = None
+
+# 带 --deep 参数启动时，检查依赖会实际运行tesseract获取版本
+DEEP_CHECK = "--deep" in sys.argv[1:]
+
+
+@functools.lru_cache(maxsize=1)
 def check_dependencies():
-    """检查依赖是否安装"""
-    missing_deps = []
-    
-    try:
-        import cv2
-    except ImportError:
-        missing_deps.append("opencv-python")
-    
-    try:
-        import numpy
-    except ImportError:
-        missing_deps.append("numpy")
+    """检查依赖是否安装（只查找模块，不执行模块初始化）
     
-    try:
-        import pyautogui
-    except ImportError:
-        missing_deps.append("pyautogui")
+    结果会被缓存，菜单循环中重复调用不再重新检查；安装依赖后调用
+    check_dependencies.cache_clear() 重新检查。返回缺失的包名元组。
+    """
+    missing_deps = []
     
-    try:
-        import pygetwindow
-    except ImportError:
-        missing_deps.append("pygetwindow")
+    for module, package in REQUIRED_PACKAGES:
+        if find_spec(module) is None:
+            missing_deps.append(package)
     
-    try:
-        import pytesseract
-    except ImportError:
-        missing_deps.append("pytesseract")
+    return tuple(missing_deps)
+
+
+def precompile_monitors():
+    """在后台把监控模块预编译成 .pyc，用户选择后导入时不必再解析源码"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
     
-    try:
-        from PIL import Image
-    except ImportError:
-        missing_deps.append("Pillow")
+    def compile_all():
+        for name in MONITOR_MODULES:
+            try:
+                py_compile.compile(os.path.join(base_dir, name), doraise=True)
+            except (py_compile.PyCompileError, OSError):
+                # 编译失败不影响菜单，导入时会给出真正的错误
+                pass
     
-    return missing_deps
+    threading.Thread(target=compile_all, daemon=True).start()
+
+
+# 显示主菜单的文本，只构建一次
+MENU_TEXT = "\n".join([
+    "\n" + "="*60,
+    "    VS Code GitHub Copilot Chat 自动监控工具",
+    "="*60,
+    "",
+    "请选择运行模式:",
+    "",
+    "1. 命令行版本 (标准)",
+    "   - 基于屏幕截图和OCR识别",
+    "   - 适合正常使用场景",
+    "   - 需要屏幕处于可见状态",
+    "",
+    "2. 高级监控版本 (推荐)",
+    "   - 支持锁屏状态下工作",
+    "   - 多种监控策略",
+    "   - 自动防止息屏",
+    "   - 更强的稳定性",
+    "",
+    "3. GUI图形界面版本",
+    "   - 友好的图形界面",
+    "   - 可视化监控状态",
+    "   - 便于配置和控制",
+    "",
+    "4. 运行功能测试",
+    "   - 测试系统依赖",
+    "   - 验证功能完整性",
+    "   - 故障诊断",
+    "",
+    "5. 安装/检查依赖",
+    "   - 检查Python包依赖",
+    "   - 提供安装指导",
+    "",
+    "6. 退出",
+    "",
+]) + "\n"
 
 
 def show_menu():
     """显示主菜单"""
-    print("\n" + "="*60)
-    print("    VS Code GitHub Copilot Chat 自动监控工具")
-    print("="*60)
-    print()
-    print("请选择运行模式:")
-    print()
-    print("1. 命令行版本 (标准)")
-    print("   - 基于屏幕截图和OCR识别")
-    print("   - 适合正常使用场景")
-    print("   - 需要屏幕处于可见状态")
-    print()
-    print("2. 高级监控版本 (推荐)")
-    print("   - 支持锁屏状态下工作")
-    print("   - 多种监控策略")
-    print("   - 自动防止息屏")
-    print("   - 更强的稳定性")
-    print()
-    print("3. GUI图形界面版本")
-    print("   - 友好的图形界面")
-    print("   - 可视化监控状态")
-    print("   - 便于配置和控制")
-    print()
-    print("4. 运行功能测试")
-    print("   - 测试系统依赖")
-    print("   - 验证功能完整性")
-    print("   - 故障诊断")
-    print()
-    print("5. 安装/检查依赖")
-    print("   - 检查Python包依赖")
-    print("   - 提供安装指导")
-    print()
-    print("6. 退出")
-    print()
+    sys.stdout.write(MENU_TEXT)
+    sys.stdout.flush()
 
 
 def install_dependencies():
     """安装依赖"""
     print("\n检查依赖包...")
+    # 用户可能已在别处手动安装过，这里总是重新检查
+    check_dependencies.cache_clear()
     missing_deps = check_dependencies()
     
     if not missing_deps:
@@ -104,8 +132,11 @@ def install_dependencies():
         try:
             import subprocess
             print("\n正在安装依赖包...")
-            result = subprocess.run([sys.executable, "-m", "pip", "install"] + missing_deps, 
+            result = subprocess.run([sys.executable, "-m", "pip", "install",
+                                     "--disable-pip-version-check", "--no-input", *missing_deps], 
                                   capture_output=True, text=True)
+            # 安装后环境已变化，下次检查重新查找模块
+            check_dependencies.cache_clear()
             
             if result.returncode == 0:
                 print("✅ 依赖包安装成功！")
@@ -178,88 +209,130 @@ def run_tests():
     input("按Enter键返回主菜单...")
 
 
-def check_tesseract():
-    """检查Tesseract OCR安装"""
+def print_tesseract_guide():
+    """打印Tesseract安装指导"""
+    print("\n安装指导:")
+    print("1. 下载: https://github.com/UB-Mannheim/tesseract/wiki")
+    print("2. 安装到默认路径: C:\\Program Files\\Tesseract-OCR\\")
+    print("3. 添加到系统PATH环境变量")
+    print("4. 下载中文语言包（可选）")
+
+
+def find_configured_tesseract():
+    """按pytesseract配置的 tesseract_cmd 查找可执行文件（如自定义的安装路径），找不到时返回None"""
     try:
         import pytesseract
+    except Exception:
+        return None
+    exe = shutil.which(pytesseract.pytesseract.tesseract_cmd)
+    if exe and os.path.exists(exe):
+        return exe
+    return None
+
+
+def check_tesseract(deep=DEEP_CHECK):
+    """检查Tesseract OCR安装
+    
+    默认只读取pytesseract的安装元数据，在PATH或 tesseract_cmd 配置的路径中查找
+    tesseract，不启动子进程；deep=True 时才运行tesseract获取版本。
+    """
+    global _TESSERACT_VERSION
+    try:
+        pytesseract_version = version("pytesseract")
+    except PackageNotFoundError:
+        print("❌ 未安装 pytesseract 包，请先安装依赖包")
+        return False
+    
+    if not deep:
+        exe = shutil.which("tesseract") or find_configured_tesseract()
+        if exe:
+            print(f"✅ Tesseract OCR 已找到: {exe} (pytesseract {pytesseract_version})")
+            print("   使用 --deep 参数启动可检查Tesseract版本")
+            return True
+        print("❌ Tesseract OCR 未安装或不在PATH中")
+        print_tesseract_guide()
+        return False
+    
+    if _TESSERACT_VERSION is not None:
+        print(f"✅ Tesseract OCR 已安装，版本: {_TESSERACT_VERSION}")
+        return True
+    
+    try:
+        import pytesseract
+        # 先查找可执行文件，未安装时不必启动子进程
+        exe = find_configured_tesseract() or shutil.which("tesseract")
+        if not exe:
+            print("❌ Tesseract OCR 未安装或不在PATH中")
+            print_tesseract_guide()
+            return False
+        
         # 尝试获取Tesseract版本
-        version = pytesseract.get_tesseract_version()
-        print(f"✅ Tesseract OCR 已安装，版本: {version}")
+        _TESSERACT_VERSION = pytesseract.get_tesseract_version()
+        print(f"✅ Tesseract OCR 已安装，版本: {_TESSERACT_VERSION}")
         return True
     except Exception as e:
         print(f"❌ Tesseract OCR 未正确安装或配置: {e}")
-        print("\n安装指导:")
-        print("1. 下载: https://github.com/UB-Mannheim/tesseract/wiki")
-        print("2. 安装到默认路径: C:\\Program Files\\Tesseract-OCR\\")
-        print("3. 添加到系统PATH环境变量")
-        print("4. 下载中文语言包（可选）")
+        print_tesseract_guide()
         return False
 
 
+def run_if_dependencies_ok(run):
+    """依赖齐全时运行指定版本，否则提示先安装依赖"""
+    missing_deps = check_dependencies()
+    if missing_deps:
+        print(f"\n❌ 缺少依赖包: {', '.join(missing_deps)}")
+        print("请先安装依赖包（选项5）")
+        input("按Enter键继续...")
+        return
+    
+    run()
+
+
+def check_and_install():
+    """依赖检查和安装"""
+    print("\n" + "="*50)
+    print("依赖检查和安装")
+    print("="*50)
+    
+    # 检查Python包依赖
+    install_dependencies()
+    
+    # 检查Tesseract OCR
+    print("\n检查Tesseract OCR...")
+    check_tesseract()
+    
+    input("\n按Enter键返回主菜单...")
+
+
+def invalid_choice():
+    """无效的菜单选项"""
+    print("\n❌ 无效选项，请重新选择")
+    input("按Enter键继续...")
+
+
+# 菜单选项 -> 处理函数
+MENU_HANDLERS = {
+    "1": lambda: run_if_dependencies_ok(run_cli_version),
+    "2": lambda: run_if_dependencies_ok(run_advanced_version),
+    "3": lambda: run_if_dependencies_ok(run_gui_version),
+    "4": run_tests,
+    "5": check_and_install,
+}
+
+
 def main():
     """主函数"""
+    precompile_monitors()
+    
     while True:
         try:
             show_menu()
             choice = input("请输入选项 (1-6): ").strip()
             
-            if choice == "1":
-                # 检查依赖
-                missing_deps = check_dependencies()
-                if missing_deps:
-                    print(f"\n❌ 缺少依赖包: {', '.join(missing_deps)}")
-                    print("请先安装依赖包（选项5）")
-                    input("按Enter键继续...")
-                    continue
-                
-                run_cli_version()
-            
-            elif choice == "2":
-                # 检查依赖
-                missing_deps = check_dependencies()
-                if missing_deps:
-                    print(f"\n❌ 缺少依赖包: {', '.join(missing_deps)}")
-                    print("请先安装依赖包（选项5）")
-                    input("按Enter键继续...")
-                    continue
-                
-                run_advanced_version()
-            
-            elif choice == "3":
-                # 检查依赖
-                missing_deps = check_dependencies()
-                if missing_deps:
-                    print(f"\n❌ 缺少依赖包: {', '.join(missing_deps)}")
-                    print("请先安装依赖包（选项5）")
-                    input("按Enter键继续...")
-                    continue
-                
-                run_gui_version()
-            
-            elif choice == "4":
-                run_tests()
-            
-            elif choice == "5":
-                print("\n" + "="*50)
-                print("依赖检查和安装")
-                print("="*50)
-                
-                # 检查Python包依赖
-                install_dependencies()
-                
-                # 检查Tesseract OCR
-                print("\n检查Tesseract OCR...")
-                check_tesseract()
-                
-                input("\n按Enter键返回主菜单...")
-            
-            elif choice == "6":
+            if choice == "6":
                 print("\n感谢使用！再见！")
                 break
-            
-            else:
-                print("\n❌ 无效选项，请重新选择")
-                input("按Enter键继续...")
+            MENU_HANDLERS.get(choice, invalid_choice)()
         
         except KeyboardInterrupt:
             print("\n\n用户中断，退出程序")
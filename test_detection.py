@@ -7,49 +7,132 @@ VS Code GitHub Copilot Chat 检测功能测试脚本
 
 import sys
 import time
-import cv2
-import numpy as np
-import pyautogui
-import pygetwindow as gw
-import pytesseract
-from PIL import Image, ImageEnhance
 import configparser
+import ctypes
+import functools
+import hashlib
 import os
+from collections import namedtuple
+from ctypes import wintypes
+from importlib.util import find_spec
 
+# cv2/numpy/pyautogui/pygetwindow/pytesseract/PIL 都较重，只在用到的测试函数内导入
 
-def test_dependencies():
-    """测试依赖包是否正确安装"""
-    print("测试依赖包...")
+# 设置环境变量 DEBUG_OCR=1 时保存OCR预处理后的中间图像
+DEBUG_OCR = os.environ.get('DEBUG_OCR') == '1'
+
+VSCODE_TITLE = "Visual Studio Code"
+
+# 测试标题两侧的分隔线
+_SEP20 = '=' * 20
+
+
+def find_vscode_hwnds():
+    """用 EnumWindows 查找标题包含 "Visual Studio Code" 的顶层窗口句柄（仅Windows）
     
-    try:
-        import cv2
-        print("✅ OpenCV 已安装")
-    except ImportError:
-        print("❌ OpenCV 未安装")
-        return False
+    先用 GetWindowTextLengthW 过滤掉标题过短的窗口，只对可能匹配的窗口读取标题。
+    """
+    user32 = ctypes.windll.user32
+    min_length = len(VSCODE_TITLE)
+    hwnds = []
     
-    try:
-        import pyautogui
-        print("✅ PyAutoGUI 已安装")
-    except ImportError:
-        print("❌ PyAutoGUI 未安装")
-        return False
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def callback(hwnd, lparam):
+        length = user32.GetWindowTextLengthW(hwnd)
+        if length < min_length:
+            return True
+        title = ctypes.create_unicode_buffer(length + 1)
+        user32.GetWindowTextW(hwnd, title, length + 1)
+        if VSCODE_TITLE in title.value:
+            hwnds.append(hwnd)
+        return True
     
-    try:
-        import pygetwindow
-        print("✅ PyGetWindow 已安装")
-    except ImportError:
-        print("❌ PyGetWindow 未安装")
-        return False
+    user32.EnumWindows(callback, 0)
+    return hwnds
+
+
+@functools.lru_cache(maxsize=1)
+def _vscode_windows():
+    """查找全部VS Code窗口，一次测试运行中只枚举一次
     
-    try:
-        import pytesseract
-        print("✅ PyTesseract 已安装")
-    except ImportError:
-        print("❌ PyTesseract 未安装")
-        return False
+    Windows下返回窗口句柄，其他平台返回 pygetwindow 窗口对象。
+    """
+    if sys.platform == 'win32':
+        return tuple(find_vscode_hwnds())
+    import pygetwindow as gw
+    return tuple(gw.getWindowsWithTitle(VSCODE_TITLE))
+
+
+# 窗口信息，字段名与 pygetwindow 的窗口属性一致
+WindowInfo = namedtuple('WindowInfo', 'title left top width height isMinimized')
+
+SW_SHOWMINIMIZED = 2
+
+
+class WINDOWPLACEMENT(ctypes.Structure):
+    """GetWindowPlacement 使用的结构体"""
+    _fields_ = [
+        ('length', wintypes.UINT),
+        ('flags', wintypes.UINT),
+        ('showCmd', wintypes.UINT),
+        ('ptMinPosition', wintypes.POINT),
+        ('ptMaxPosition', wintypes.POINT),
+        ('rcNormalPosition', wintypes.RECT),
+    ]
+
+
+def get_window_info(hwnd):
+    """用 GetWindowRect 取得窗口位置，GetWindowPlacement 判断是否最小化，再读一次标题（仅Windows）
+    
+    rcNormalPosition 是还原状态下的工作区坐标，最大化窗口与实际位置不符，所以只用 showCmd。
+    """
+    user32 = ctypes.windll.user32
+    rect = wintypes.RECT()
+    user32.GetWindowRect(hwnd, ctypes.byref(rect))
+    
+    placement = WINDOWPLACEMENT()
+    placement.length = ctypes.sizeof(WINDOWPLACEMENT)
+    user32.GetWindowPlacement(hwnd, ctypes.byref(placement))
+    
+    length = user32.GetWindowTextLengthW(hwnd)
+    title = ctypes.create_unicode_buffer(length + 1)
+    user32.GetWindowTextW(hwnd, title, length + 1)
     
-    return True
+    return WindowInfo(
+        title.value,
+        rect.left,
+        rect.top,
+        rect.right - rect.left,
+        rect.bottom - rect.top,
+        placement.showCmd == SW_SHOWMINIMIZED,
+    )
+
+
+def _have(name):
+    """模块已导入或可以找到时返回True"""
+    return name in sys.modules or find_spec(name) is not None
+
+
+def test_dependencies():
+    """测试依赖包是否正确安装（只查找模块，不执行模块初始化）"""
+    print("测试依赖包...")
+    
+    dependencies = [
+        ('cv2', 'OpenCV'),
+        ('pyautogui', 'PyAutoGUI'),
+        ('pygetwindow', 'PyGetWindow'),
+        ('pytesseract', 'PyTesseract'),
+    ]
+    
+    ok = True
+    for module, name in dependencies:
+        if _have(module):
+            print(f"✅ {name} 已安装")
+        else:
+            print(f"❌ {name} 未安装")
+            ok = False
+    
+    return ok
 
 
 def test_tesseract():
@@ -57,20 +140,18 @@ def test_tesseract():
     print("\n测试Tesseract OCR...")
     
     try:
+        import cv2
+        import numpy as np
+        import pytesseract
+        
         # 创建一个简单的测试图像
-        test_img = np.ones((100, 300, 3), dtype=np.uint8) * 255
+        test_img = np.full((100, 300, 3), 255, dtype=np.uint8)
         cv2.putText(test_img, "Hello World", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
         
-        # 保存测试图像
-        cv2.imwrite("test_ocr.png", test_img)
-        
-        # 进行OCR测试
-        result = pytesseract.image_to_string(Image.open("test_ocr.png"))
+        # 直接对内存中的图像进行OCR测试，不再经过磁盘文件
+        result = pytesseract.image_to_string(test_img)
         print(f"OCR测试结果: '{result.strip()}'")
         
-        # 清理测试文件
-        os.remove("test_ocr.png")
-        
         if "Hello" in result or "World" in result:
             print("✅ Tesseract OCR 工作正常")
             return True
@@ -88,7 +169,11 @@ def test_vscode_detection():
     print("\n测试VS Code窗口检测...")
     
     try:
-        windows = gw.getWindowsWithTitle("Visual Studio Code")
+        if sys.platform == 'win32':
+            windows = [get_window_info(hwnd) for hwnd in _vscode_windows()]
+        else:
+            windows = _vscode_windows()
+        
         if windows:
             print(f"✅ 找到 {len(windows)} 个VS Code窗口:")
             for i, window in enumerate(windows):
@@ -112,6 +197,8 @@ def test_screenshot():
     print("\n测试屏幕截图功能...")
     
     try:
+        import pyautogui
+        
         # 截取整个屏幕
         screenshot = pyautogui.screenshot()
         print(f"✅ 截图成功，尺寸: {screenshot.size}")
@@ -132,12 +219,18 @@ def test_vscode_screenshot():
     print("\n测试VS Code窗口截图...")
     
     try:
-        windows = gw.getWindowsWithTitle("Visual Studio Code")
+        import cv2
+        import numpy as np
+        import pyautogui
+        import pygetwindow as gw
+        
+        # 复用窗口检测测试的枚举结果
+        windows = _vscode_windows()
         if not windows:
             print("❌ 未找到VS Code窗口，无法进行截图测试")
             return False
         
-        window = windows[0]
+        window = gw.Win32Window(windows[0]) if sys.platform == 'win32' else windows[0]
         if window.isMinimized:
             window.restore()
             time.sleep(1)
@@ -154,9 +247,11 @@ def test_vscode_screenshot():
         print("✅ VS Code窗口截图已保存为 test_vscode_screenshot.png")
         
         # 测试聊天区域截图（右半部分）
-        img_array = np.array(screenshot)
-        chat_area = img_array[:, width//2:]
-        cv2.imwrite("test_chat_area.png", cv2.cvtColor(chat_area, cv2.COLOR_RGB2BGR))
+        # 窗口整图已经截好，切片和 [..., ::-1] 通道翻转都是视图，
+        # 只在写PNG前由 ascontiguousarray 复制一次右半部分
+        img_array = np.asarray(screenshot)
+        chat_area = img_array[:, width//2:, ::-1]
+        cv2.imwrite("test_chat_area.png", np.ascontiguousarray(chat_area))
         print("✅ 聊天区域截图已保存为 test_chat_area.png")
         
         return True
@@ -175,19 +270,33 @@ def test_ocr_on_vscode():
         return False
     
     try:
-        # 读取聊天区域截图
-        image = cv2.imread("test_chat_area.png")
+        import cv2
+        import pytesseract
+        
+        # 按截图内容哈希缓存预处理结果，同一张截图重复测试时跳过预处理
+        with open("test_chat_area.png", "rb") as f:
+            digest = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+        cache_path = f".ocr_cache_{digest}.png"
         
-        # 预处理图像
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        enhanced = clahe.apply(gray)
-        denoised = cv2.medianBlur(enhanced, 3)
-        _, binary = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        if os.path.exists(cache_path):
+            binary = cv2.imread(cache_path, cv2.IMREAD_GRAYSCALE)
+            print(f"✅ 使用缓存的预处理图像: {cache_path}")
+        else:
+            # 读取聊天区域截图
+            image = cv2.imread("test_chat_area.png")
+            
+            # 预处理图像
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+            enhanced = clahe.apply(gray)
+            denoised = cv2.medianBlur(enhanced, 3)
+            _, binary = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            cv2.imwrite(cache_path, binary)
         
-        # 保存预处理后的图像
-        cv2.imwrite("test_processed.png", binary)
-        print("✅ 预处理图像已保存为 test_processed.png")
+        # 调试时保存预处理后的图像
+        if DEBUG_OCR:
+            cv2.imwrite("test_processed.png", binary)
+            print("✅ 预处理图像已保存为 test_processed.png")
         
         # 进行OCR识别
         custom_config = r'--oem 3 --psm 6 -l eng+chi_sim'
@@ -217,6 +326,8 @@ def test_automation():
     print("如果不想继续，请按Ctrl+C")
     
     try:
+        import pyautogui
+        
         for i in range(5, 0, -1):
             print(f"倒计时: {i}")
             time.sleep(1)
@@ -253,19 +364,21 @@ def test_automation():
 
 
 def cleanup_test_files():
-    """清理测试文件"""
-    test_files = [
+    """清理测试文件（一次目录扫描找出所有要删除的文件）"""
+    test_files = {
         "test_screenshot.png",
         "test_vscode_screenshot.png", 
         "test_chat_area.png",
         "test_processed.png"
-    ]
+    }
     
     print("\n清理测试文件...")
-    for file in test_files:
-        if os.path.exists(file):
-            os.remove(file)
-            print(f"已删除: {file}")
+    with os.scandir('.') as entries:
+        for entry in entries:
+            # 截图删除后对应的OCR预处理缓存也不会再命中
+            if entry.name in test_files or entry.name.startswith(".ocr_cache_"):
+                os.unlink(entry.path)
+                print(f"已删除: {entry.name}")
 
 
 def main():
@@ -285,7 +398,7 @@ def main():
     results = {}
     
     for test_name, test_func in tests:
-        print(f"\n{'='*20} {test_name} {'='*20}")
+        print(f"\n{_SEP20} {test_name} {_SEP20}")
         try:
             results[test_name] = test_func()
         except KeyboardInterrupt:
@@ -297,11 +410,11 @@ def main():
     
     # 询问是否测试自动化操作
     if input("\n是否测试自动化操作？(y/N): ").lower().startswith('y'):
-        print(f"\n{'='*20} 自动化操作测试 {'='*20}")
+        print(f"\n{_SEP20} 自动化操作测试 {_SEP20}")
         results["自动化操作"] = test_automation()
     
     # 显示测试结果摘要
-    print(f"\n{'='*20} 测试结果摘要 {'='*20}")
+    print(f"\n{_SEP20} 测试结果摘要 {_SEP20}")
     for test_name, result in results.items():
         status = "✅ 通过" if result else "❌ 失败"
         print(f"{test_name}: {status}")